@@ -1,15 +1,51 @@
 """
 Module for advanced analysis techniques for Betaflight logs
 """
+from concurrent.futures import ThreadPoolExecutor
+import itertools
 import numpy as np
 from scipy import signal, linalg
-import matplotlib.pyplot as plt
-import pandas as pd
+from betaflight_log_analyzer.utils.spectral import cross_spectra, power_spectrum
 try:
     import pywt  # PyWavelets for wavelet analysis
 except ImportError:
     pywt = None
 
+# Frequencies resolved by the wavelet analysis, spanning the 2-100 Hz
+# oscillation bands it reports on
+_WAVELET_FREQUENCIES = np.geomspace(2, 100, 60)
+
+def _arx_predict(A, B, y, u, nk):
+    """
+    Simulate an ARX model over a recorded input
+    
+    The first len(A)-1 outputs are taken from the recorded data as initial
+    conditions, the rest follow A(q)y(t) = B(q)u(t-nk) using the model's own
+    past outputs. The recurrence is evaluated by lfilter instead of in Python.
+    """
+    na = len(A) - 1
+    b = np.concatenate((np.zeros(nk), B))
+    
+    y_pred = np.empty(len(y))
+    y_pred[:na] = y[:na]  # Initial conditions
+    
+    # Seed the filter state with the samples preceding the simulated span
+    zi = signal.lfiltic(b, A, y[na-1::-1], u[na-1::-1])
+    y_pred[na:] = signal.lfilter(b, A, u[na:], zi=zi)[0]
+    return y_pred
+
+def _arx_step_response(A, B, nk, step_length=200):
+    """Calculate the step response of an ARX model, starting from rest for len(A)-1 samples"""
+    na = len(A) - 1
+    b = np.concatenate((np.zeros(nk), B))
+    
+    step_output = np.zeros(step_length)
+    
+    # The unit step is already applied during the initial samples
+    zi = signal.lfiltic(b, A, np.zeros(na), np.ones(na))
+    step_output[na:] = signal.lfilter(b, A, np.ones(step_length - na), zi=zi)[0]
+    return step_output
+
 class AdvancedAnalyzer:
     """Class for advanced analysis of flight data"""
     
@@ -21,6 +57,13 @@ class AdvancedAnalyzer:
             print("Warning: PyWavelets not installed. Wavelet analysis not available.")
             print("Install with: pip install PyWavelets")
     
+    @staticmethod
+    def _sampling_frequency(time_data):
+        """Return the sampling frequency of a time array"""
+        # The mean of the sample intervals telescopes to the end points, so this
+        # is O(1) and needs no cache (nor a reference to the caller's array)
+        return (len(time_data) - 1) / (time_data[-1] - time_data[0])
+    
     def estimate_transfer_function(self, time_data, setpoint_data, gyro_data):
         """
         Estimate the transfer function of the system using frequency domain techniques
@@ -34,15 +77,16 @@ class AdvancedAnalyzer:
             Dictionary with transfer function data
         """
         # Calculate sampling frequency
-        dt = np.mean(np.diff(time_data))
-        fs = 1/dt  # Sampling frequency
+        fs = self._sampling_frequency(time_data)
         
-        # Calculate frequency response using Welch's method
-        freq, Pxx_setpoint = signal.welch(setpoint_data, fs, nperseg=1024)
-        freq, Pxx_gyro = signal.welch(gyro_data, fs, nperseg=1024)
+        # Blackbox data is 16-bit, so single precision loses nothing and halves
+        # the memory traffic of the spectral estimates
+        setpoint_data = np.asarray(setpoint_data, dtype=np.float32)
+        gyro_data = np.asarray(gyro_data, dtype=np.float32)
         
-        # Calculate cross-spectral density
-        freq, Pxy = signal.csd(setpoint_data, gyro_data, fs, nperseg=1024)
+        # Calculate auto and cross spectral densities using Welch's method,
+        # transforming each signal only once
+        freq, Pxx_setpoint, Pxx_gyro, Pxy = cross_spectra(setpoint_data, gyro_data, fs, nperseg=1024)
         
         # Calculate transfer function estimate
         H = Pxy / (Pxx_setpoint + 1e-10)  # Add small value to avoid division by zero
@@ -50,7 +94,7 @@ class AdvancedAnalyzer:
         H_phase = np.angle(H, deg=True)
         
         # Calculate coherence (measure of linear relationship between input and output)
-        freq, coherence = signal.coherence(setpoint_data, gyro_data, fs, nperseg=1024)
+        coherence = np.abs(Pxy)**2 / (Pxx_setpoint * Pxx_gyro)
         
         # Extract frequency response characteristics
         # Find gain margin and phase margin areas
@@ -61,14 +105,12 @@ class AdvancedAnalyzer:
         # Find resonant frequencies (peaks in magnitude response)
         # Ignore very low frequencies
         start_idx = np.argmax(freq > 1.0)
-        peaks, _ = signal.find_peaks(H_mag[start_idx:])
+        # Only consider peaks with significant magnitude (strictly above 1.1;
+        # find_peaks' height bound is inclusive)
+        peaks, properties = signal.find_peaks(H_mag[start_idx:], height=np.nextafter(1.1, np.inf))
         peaks += start_idx
         
-        resonant_freqs = []
-        if len(peaks) > 0:
-            # Only consider peaks with significant magnitude
-            significant_peaks = [p for p in peaks if H_mag[p] > 1.1]
-            resonant_freqs = [(freq[p], H_mag[p]) for p in significant_peaks]
+        resonant_freqs = list(zip(freq[peaks], properties['peak_heights']))
         
         return {
             'frequencies': freq,
@@ -95,9 +137,10 @@ class AdvancedAnalyzer:
             Dictionary with ARX model parameters and fit quality
         """
         try:
-            # Ensure arrays are properly shaped
-            y = gyro_data.flatten()
-            u = setpoint_data.flatten()
+            # Ensure arrays are properly shaped. The fit stays in double precision:
+            # the normal equations square the condition number of phi.
+            y = np.asarray(gyro_data, dtype=np.float64).flatten()
+            u = np.asarray(setpoint_data, dtype=np.float64).flatten()
             
             # Ensure we have enough data points for ARX modeling
             N = len(y)
@@ -105,57 +148,40 @@ class AdvancedAnalyzer:
                 print("Not enough data points for ARX modeling")
                 return self._create_dummy_arx_result(N)
             
-            # Construct data matrices
-            phi = np.zeros((N-na, na+nb))
+            # Construct data matrices from sliding windows over y and u, writing
+            # both parts straight into one uninitialized regressor matrix.
+            # Row i holds [-y[i+na-1], ..., -y[i], u[i+na-nk], ..., u[i+na-nk-nb+1]]
+            phi = np.empty((N - na, na + nb))
             
-            for i in range(N-na):
-                # AR part - fixed slicing to properly fill the array
-                for j in range(na):
-                    if i+na-1-j >= 0:
-                        phi[i, j] = -y[i+na-1-j]
-                    else:
-                        phi[i, j] = 0
-                
-                # Input part (with delay)
-                for j in range(nb):
-                    idx = i+na-nk-j
-                    if idx >= 0 and idx < N:
-                        phi[i, na+j] = u[idx]
-                    else:
-                        phi[i, na+j] = 0
+            # AR part: windows of na past outputs, newest first
+            y_win = np.lib.stride_tricks.sliding_window_view(y[:N-1], na)[:, ::-1]
+            np.negative(y_win, out=phi[:, :na])
+            
+            # Input part (with delay): zero-pad the front for indices before the log start
+            u_start = na - nk - nb + 1
+            u_pad = max(0, -u_start)
+            u_padded = np.concatenate((np.zeros(u_pad), u)) if u_pad else u
+            u_start += u_pad
+            phi[:, na:] = np.lib.stride_tricks.sliding_window_view(
+                u_padded[u_start:u_start + N - na + nb - 1], nb
+            )[:, ::-1]
             
             # Output vector
             Y = y[na:]
             
-            # Least squares estimation of parameters
+            # Least squares estimation of parameters via the normal equations.
+            # phi only has na+nb columns, so phi^T phi is tiny and a Cholesky
+            # solve is much cheaper than a full SVD of phi.
             try:
-                theta = linalg.lstsq(phi, Y)[0]
+                try:
+                    theta = linalg.cho_solve(linalg.cho_factor(phi.T @ phi), phi.T @ Y)
+                except linalg.LinAlgError:
+                    # Rank deficient regressors (e.g. constant input), fall back to SVD
+                    theta = linalg.lstsq(phi, Y)[0]
             except Exception as e:
                 print(f"Error in ARX parameter estimation: {e}")
                 return self._create_dummy_arx_result(N)
             
-            # Model output prediction
-            y_pred = np.zeros_like(y)
-            y_pred[:na] = y[:na]  # Initial conditions
-            
-            for i in range(na, N):
-                # AR part
-                ar_part = 0
-                for j in range(na):
-                    ar_part -= theta[j] * y_pred[i-j-1]
-                    
-                # Input part
-                input_part = 0
-                for j in range(nb):
-                    idx = i-j-nk
-                    if idx >= 0:
-                        input_part += theta[na+j] * u[idx]
-                
-                y_pred[i] = ar_part + input_part
-            
-            # Calculate fit percentage (normalized root mean square error)
-            fit = 100 * (1 - np.linalg.norm(y-y_pred) / np.linalg.norm(y-np.mean(y)))
-            
             # Extract dynamics characteristics from the model
             # A(q)y(t) = B(q)u(t-nk)
             # A(q) = 1 + a1*q^-1 + ... + ana*q^-na
@@ -163,30 +189,14 @@ class AdvancedAnalyzer:
             A = np.concatenate(([1.0], theta[:na]))
             B = theta[na:]
             
-            # Calculate step response from the model
-            step_length = 200
-            step_input = np.ones(step_length)
-            step_output = np.zeros(step_length)
+            # Model output prediction
+            y_pred = _arx_predict(A, B, y, u, nk)
             
-            # Initial conditions
-            for i in range(na):
-                step_output[i] = 0
+            # Calculate fit percentage (normalized root mean square error)
+            fit = 100 * (1 - np.linalg.norm(y-y_pred) / np.linalg.norm(y-np.mean(y)))
             
-            # Calculate step response
-            for i in range(na, step_length):
-                # AR part
-                ar_part = 0
-                for j in range(na):
-                    ar_part -= A[j+1] * step_output[i-j-1]
-                    
-                # Input part (with delay)
-                input_part = 0
-                for j in range(nb):
-                    idx = i-j-nk
-                    if idx >= 0 and idx < step_length:
-                        input_part += B[j] * step_input[idx]
-                
-                step_output[i] = ar_part + input_part
+            # Calculate step response from the model
+            step_output = _arx_step_response(A, B, nk, step_length=200)
             
             return {
                 'parameters': theta,
@@ -200,6 +210,50 @@ class AdvancedAnalyzer:
             print(f"Error in ARX model identification: {e}")
             return self._create_dummy_arx_result(len(gyro_data))
     
+    def identify_arx_grid(self, time_data, setpoint_data, gyro_data,
+                          na_range=range(1, 5), nb_range=range(1, 5), nk_range=range(1, 3),
+                          max_workers=None):
+        """
+        Fit ARX models over a grid of orders and delays and keep the best one
+        
+        The fits are independent and spend their time in NumPy/LAPACK, which
+        release the GIL, so they are run on a thread pool.
+        
+        Args:
+            time_data: Array of time values
+            setpoint_data: Array of setpoint values (input)
+            gyro_data: Array of gyro values (output)
+            na_range: Orders of the AR part to try
+            nb_range: Orders of the input part to try
+            nk_range: Delays to try
+            max_workers: Maximum number of worker threads (None for the executor
+                default, 1 when already running in one of several worker processes)
+            
+        Returns:
+            Dictionary with the best ARX model (as returned by identify_arx_model),
+            its 'order' as (na, nb, nk) and the 'grid' of fit values per order
+        """
+        orders = list(itertools.product(na_range, nb_range, nk_range))
+        
+        def fit_order(order):
+            # High orders can be unstable and overflow in the prediction; their
+            # fit comes out NaN and is skipped below, so the warnings are noise
+            with np.errstate(over='ignore', invalid='ignore'):
+                return self.identify_arx_model(time_data, setpoint_data, gyro_data, *order)
+        
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            results = list(executor.map(fit_order, orders))
+        
+        # Unstable orders can produce NaN fits, which must never win
+        fits = np.array([result['fit'] for result in results], dtype=float)
+        best = int(np.nanargmax(fits)) if not np.all(np.isnan(fits)) else 0
+        
+        return {
+            **results[best],
+            'order': orders[best],
+            'grid': {order: result['fit'] for order, result in zip(orders, results)}
+        }
+    
     def _create_dummy_arx_result(self, N):
         """Create a dummy ARX result when the real computation fails"""
         # Create a simple dummy model that can be displayed without errors
@@ -232,82 +286,60 @@ class AdvancedAnalyzer:
             return None
         
         # Sampling frequency
-        dt = np.mean(np.diff(time_data))
-        fs = 1/dt
+        fs = self._sampling_frequency(time_data)
         
-        # Remove mean from the signal
+        # Remove mean from the signal. Single precision is plenty for gyro data
+        # and halves the memory traffic of the (scales x samples) CWT output.
+        gyro_data = np.asarray(gyro_data, dtype=np.float32)
         data = gyro_data - np.mean(gyro_data)
         
         # Perform continuous wavelet transform
-        scales = np.arange(1, 128)
         wavelet = 'morl'  # Morlet wavelet
         
-        # Compute CWT
-        coef, freqs = pywt.cwt(data, scales, wavelet, 1.0/fs)
+        # Only compute the scales that land in the bands of interest, spaced
+        # evenly in log frequency (and below Nyquist for low rate logs)
+        frequencies = _WAVELET_FREQUENCIES[_WAVELET_FREQUENCIES < fs / 2]
+        scales = pywt.central_frequency(wavelet) * fs / frequencies
         
-        # Convert scales to frequencies
-        frequencies = pywt.scale2frequency(wavelet, scales) * fs
+        # Compute CWT, convolving via FFT rather than directly for every scale
+        coef, freqs = pywt.cwt(data, scales, wavelet, 1.0/fs, method='fft')
         
-        # Calculate wavelet power
-        power = np.abs(coef)**2
+        # Calculate wavelet power (the Morlet CWT is real, so no complex abs needed).
+        # Square in place so long logs only ever hold one (scales x samples) array.
+        power = np.square(coef, out=coef)
         
-        # Find dominant frequencies over time
+        # Find dominant frequencies over time, reading the peak power off the
+        # argmax instead of making a second full pass with np.max
         dominant_scales = np.argmax(power, axis=0)
         dominant_freqs = frequencies[dominant_scales]
+        max_power_over_time = np.take_along_axis(power, dominant_scales[np.newaxis, :], axis=0)[0]
         
         # Find regions with significant oscillations
         # We'll define these as regions where the power exceeds a threshold
         # and the dominant frequency is within certain bands
         power_threshold = np.mean(power) + 2 * np.std(power)
-        max_power_over_time = np.max(power, axis=0)
         
         # Define frequency bands
         low_band = (2, 10)   # 2-10 Hz: low frequency oscillations
         mid_band = (10, 30)  # 10-30 Hz: mid frequency oscillations
         high_band = (30, 100) # 30-100 Hz: high frequency oscillations
         
-        # Find regions with significant oscillations in each band
-        def find_oscillation_regions(freqs, power_over_time, band, threshold):
-            mask = (freqs >= band[0]) & (freqs < band[1])
-            if not np.any(mask):
-                return []
-                
-            band_power = np.max(power[:, mask], axis=1)
-            significant = band_power > threshold
-            
-            # Find continuous regions
-            regions = []
-            start = None
-            for i, sig in enumerate(significant):
-                if sig and start is None:
-                    start = i
-                elif not sig and start is not None:
-                    regions.append((start, i))
-                    start = None
-            
-            # Add last region if it extends to the end
-            if start is not None:
-                regions.append((start, len(significant)))
-                
-            return regions
-        
-        low_regions = []
-        mid_regions = []
-        high_regions = []
-        
-        for i, freq in enumerate(dominant_freqs):
-            if max_power_over_time[i] > power_threshold:
-                if low_band[0] <= freq < low_band[1]:
-                    low_regions.append(i)
-                elif mid_band[0] <= freq < mid_band[1]:
-                    mid_regions.append(i)
-                elif high_band[0] <= freq < high_band[1]:
-                    high_regions.append(i)
-        
-        # Convert indices to time values
-        low_regions_time = [time_data[i] for i in low_regions]
-        mid_regions_time = [time_data[i] for i in mid_regions]
-        high_regions_time = [time_data[i] for i in high_regions]
+        # Band of every scale: 0 below the low band, 1-3 for low/mid/high, 4 above.
+        # Each sample's band is then a single lookup of its dominant scale,
+        # rather than a pass over the power array per band.
+        band_of_scale = np.digitize(frequencies, [low_band[0], low_band[1], mid_band[1], high_band[1]])
+        dominant_bands = band_of_scale[dominant_scales]
+        
+        # Samples with significant power, split by the band of their dominant frequency
+        significant = max_power_over_time > power_threshold
+        low_mask = significant & (dominant_bands == 1)
+        mid_mask = significant & (dominant_bands == 2)
+        high_mask = significant & (dominant_bands == 3)
+        
+        # Convert sample masks to time values
+        low_regions_time = time_data[low_mask]
+        mid_regions_time = time_data[mid_mask]
+        high_regions_time = time_data[high_mask]
         
         return {
             'time': time_data,
@@ -319,7 +351,7 @@ class AdvancedAnalyzer:
             'high_regions': high_regions_time
         }
     
-    def calculate_performance_index(self, time_data, setpoint_data, gyro_data):
+    def calculate_performance_index(self, time_data, setpoint_data, gyro_data, gyro_psd=None):
         """
         Calculate a comprehensive performance index based on multiple metrics
         
@@ -327,21 +359,30 @@ class AdvancedAnalyzer:
             time_data: Array of time values
             setpoint_data: Array of setpoint values
             gyro_data: Array of gyro values
+            gyro_psd: Optional precomputed (frequencies, power) Welch PSD of gyro_data
+                (1024 sample segments), e.g. the segment analysis' frequency_analysis
             
         Returns:
             Dictionary with performance metrics
         """
+        # Single precision is plenty for 16-bit blackbox data
+        setpoint_data = np.asarray(setpoint_data, dtype=np.float32)
+        gyro_data = np.asarray(gyro_data, dtype=np.float32)
+        
         # Calculate tracking error
         error = setpoint_data - gyro_data
         
-        # Basic error statistics
-        error_mean = np.mean(np.abs(error))
-        error_rms = np.sqrt(np.mean(np.square(error)))
-        error_peak = np.max(np.abs(error))
+        # Basic error statistics. The sum of squares is a dot product and the
+        # absolute error overwrites the error array, so no temporaries are made.
+        error_rms = np.sqrt(np.dot(error, error) / len(error))
+        abs_error = np.abs(error, out=error)
+        error_mean = np.mean(abs_error)
+        error_peak = np.max(abs_error)
         
-        # Calculate frequency content
-        fs = 1 / np.mean(np.diff(time_data))
-        f, pxx = signal.welch(gyro_data, fs, nperseg=1024)
+        # Calculate frequency content, unless the caller already has it
+        if gyro_psd is None:
+            gyro_psd = power_spectrum(gyro_data, self._sampling_frequency(time_data), nperseg=1024)
+        f, pxx = gyro_psd
         
         # Find dominant frequency and its power
         peak_idx = np.argmax(pxx)
@@ -358,7 +399,7 @@ class AdvancedAnalyzer:
             high_freq_ratio = 0
         
         # Calculate responsiveness (cross-correlation between setpoint and gyro)
-        corr = np.correlate(setpoint_data, gyro_data, mode='full')
+        corr = signal.correlate(setpoint_data, gyro_data, mode='full', method='fft')
         corr_max = np.max(corr)
         corr_lag = np.argmax(corr) - len(setpoint_data) + 1
         responsiveness = corr_max / (np.std(setpoint_data) * np.std(gyro_data) * len(setpoint_data))
@@ -1,8 +1,87 @@
 """
 Module for PID tuning recommendations
 """
+from collections import namedtuple
+import math
 import numpy as np
 
+# Axes in the order they are stacked in the aggregated basic results
+_AXES = ('roll', 'pitch', 'yaw')
+
+# Fixed summary and confidence texts, built once at import
+_WELL_TUNED = {
+    axis: f"Your {axis.upper()} axis appears to be well-tuned! No significant adjustments needed."
+    for axis in _AXES
+}
+_MINOR_ADJUSTMENTS = {
+    axis: f"Your {axis.upper()} axis tuning could be improved, but only minor adjustments are recommended:"
+    for axis in _AXES
+}
+_CONFIDENCE_HIGH = " (High - based on comprehensive analysis)"
+_CONFIDENCE_MEDIUM = " (Medium - based on multiple analysis methods)"
+_CONFIDENCE_LOW = " (Low - limited analysis available)"
+_CONFIDENCE_BASIC = " (Based on basic analysis only)"
+
+# Basic metrics in the order they are stacked along the last axis of the
+# aggregated basic results, see _aggregate_basic_results
+BasicAggregate = namedtuple('BasicAggregate', ['error_mean', 'error_rms', 'error_peak', 'peak_freq', 'peak_power'])
+
+# Advanced analysis results collected per axis
+_ANALYSIS_TYPES = ('transfer_function', 'arx_model', 'performance')
+
+# Scores averaged over the performance index results of all segments
+_PERFORMANCE_SCORES = ('tracking_score', 'noise_score', 'response_score', 'performance_index')
+
+def _mean(values):
+    """Average a short Python list without the overhead of converting it to an array (0 if empty)"""
+    return math.fsum(values) / len(values) if values else 0.0
+
+def _step_response_features(step_responses):
+    """
+    Extract rise time, settling time and overshoot from a batch of step responses
+    
+    Responses whose steady state (mean of the last 20 samples) is too close to
+    zero are skipped, as are features that are undefined for a response.
+    
+    Args:
+        step_responses: Array of shape (responses, samples)
+        
+    Returns:
+        Tuple of (rise_times, settling_times, overshoots) arrays, each holding one
+        value per response for which the feature is defined
+    """
+    n_samples = step_responses.shape[1]
+    steady_state = step_responses[:, -20:].mean(axis=1)
+    abs_steady_state = np.abs(steady_state)
+    valid = abs_steady_state >= 1e-6
+    steady_state = steady_state[:, np.newaxis]
+    
+    # Rise time (10% to 90%), argmax gives the first crossing
+    reached_10 = step_responses >= 0.1 * steady_state
+    reached_90 = step_responses >= 0.9 * steady_state
+    has_rise = valid & reached_10.any(axis=1) & reached_90.any(axis=1)
+    rise_10_idx = np.argmax(reached_10, axis=1)
+    rise_90_idx = np.argmax(reached_90, axis=1)
+    rise_times = (rise_90_idx - rise_10_idx)[has_rise]
+    
+    # Settling time: the first sample that starts a run of 30 samples all
+    # within the settling band
+    n_windows = n_samples - 30
+    if n_windows > 0:
+        within = np.abs(step_responses - steady_state) <= 0.05 * steady_state
+        settled = np.lib.stride_tricks.sliding_window_view(within, 30, axis=1)[:, :n_windows].all(axis=2)
+        settling_times = np.argmax(settled, axis=1)[valid & settled.any(axis=1)]
+    else:
+        settling_times = np.empty(0, dtype=np.intp)
+    
+    # Overshoot: peak after the 90% crossing relative to the steady state
+    has_overshoot = has_rise & (rise_90_idx > 0) & (rise_90_idx < n_samples - 1)
+    after_rise = np.arange(n_samples) >= rise_90_idx[:, np.newaxis]
+    max_response = np.where(after_rise, step_responses, -np.inf).max(axis=1)[has_overshoot]
+    overshoots = (max_response - steady_state[has_overshoot, 0]) / abs_steady_state[has_overshoot] * 100
+    
+    return rise_times, settling_times, overshoots
+
 class PIDRecommender:
     """Class for generating PID tuning recommendations"""
     
@@ -38,233 +117,212 @@ class PIDRecommender:
         if has_advanced:
             advanced_aggregated = self._aggregate_advanced_results(advanced_results)
         
+        # Look the confidence weights and the combine function up once
+        weighted_combine = self._weighted_combine
+        w_basic = self.confidence_weights['basic']
+        w_transfer = self.confidence_weights['transfer']
+        w_arx = self.confidence_weights['arx']
+        w_performance = self.confidence_weights['performance']
+        w_performance_boost = w_performance * 1.5
+        
+        # Generate recommendations from basic metrics, for all axes at once
+        basic_results = self._generate_basic_recommendations(aggregated)
+        
         # Generate recommendations for each axis
         recommendations = {}
         all_recommendations_text = {}
         
-        for axis in ['roll', 'pitch', 'yaw']:
+        for axis in _AXES:
             # Skip if no data for this axis
-            if not aggregated[axis]['error_rms']:
+            if axis not in basic_results:
                 continue
                 
-            # Generate recommendations from basic metrics
-            basic_rec, basic_text = self._generate_basic_recommendations(aggregated, axis)
+            basic_rec, basic_text = basic_results[axis]
+            averages = basic_rec['averages']
             
-            # Initialize with basic recommendations
-            p_adjustment = basic_rec['P']
-            i_adjustment = basic_rec['I']
-            d_adjustment = basic_rec['D']
+            # Initialize with basic recommendations, tracking the P/I/D adjustments
+            # as one vector so each analysis source is combined in a single update,
+            # and the terms any source recommended increasing or decreasing
+            adjustments = np.array([basic_rec['P'], basic_rec['I'], basic_rec['D']], dtype=np.float64)
+            increase = set(basic_rec['increase'])
+            decrease = set(basic_rec['decrease'])
             recommendations_text = basic_text
-            confidence = self.confidence_weights['basic']
+            confidence = w_basic
             
             # Add recommendations from advanced analysis if available
             if has_advanced and axis in advanced_aggregated:
                 adv_data = advanced_aggregated[axis]
                 
-                # Generate recommendations from transfer function
+                # Generate recommendations from transfer function (P and D only)
                 if 'transfer_function' in adv_data:
                     tf_rec, tf_text = self._generate_tf_recommendations(adv_data['transfer_function'], axis)
-                    p_adjustment = self._weighted_combine(p_adjustment, tf_rec['P'], 
-                                                        self.confidence_weights['basic'], 
-                                                        self.confidence_weights['transfer'])
-                    d_adjustment = self._weighted_combine(d_adjustment, tf_rec['D'], 
-                                                        self.confidence_weights['basic'], 
-                                                        self.confidence_weights['transfer'])
+                    adjustments[::2] = weighted_combine(adjustments[::2], [tf_rec['P'], tf_rec['D']],
+                                                         w_basic, w_transfer)
                     recommendations_text.extend(tf_text)
-                    confidence += self.confidence_weights['transfer']
+                    increase |= tf_rec['increase']
+                    decrease |= tf_rec['decrease']
+                    confidence += w_transfer
                 
                 # Generate recommendations from ARX model
                 if 'arx_model' in adv_data:
                     arx_rec, arx_text = self._generate_arx_model_recommendations(adv_data['arx_model'], axis)
-                    p_adjustment = self._weighted_combine(p_adjustment, arx_rec['P'], 
-                                                        confidence, 
-                                                        self.confidence_weights['arx'])
-                    i_adjustment = self._weighted_combine(i_adjustment, arx_rec['I'], 
-                                                        confidence, 
-                                                        self.confidence_weights['arx'])
-                    d_adjustment = self._weighted_combine(d_adjustment, arx_rec['D'], 
-                                                        confidence, 
-                                                        self.confidence_weights['arx'])
+                    adjustments = weighted_combine(adjustments, [arx_rec['P'], arx_rec['I'], arx_rec['D']],
+                                                    confidence, w_arx)
                     recommendations_text.extend(arx_text)
-                    confidence += self.confidence_weights['arx']
+                    increase |= arx_rec['increase']
+                    decrease |= arx_rec['decrease']
+                    confidence += w_arx
                 
                 # Generate recommendations from performance index
                 if 'performance' in adv_data:
                     perf_rec, perf_text = self._generate_performance_recommendations(adv_data['performance'], axis)
-                    
-                    # Calculate average scores from the performance data list
-                    perf_data_list = adv_data['performance']
-                    tracking_scores = [data.get('tracking_score', 0) for data in perf_data_list]
-                    performance_indices = [data.get('performance_index', 0) for data in perf_data_list]
-                    
-                    avg_tracking = np.mean(tracking_scores) if tracking_scores else 0
-                    avg_performance = np.mean(performance_indices) if performance_indices else 0
+                    avg_tracking = perf_rec['averages']['tracking']
+                    avg_performance = perf_rec['averages']['performance']
                     
                     # Apply performance recommendations with high weight if scores are low
                     if avg_tracking < 60 or avg_performance < 60:
-                        p_adjustment = self._weighted_combine(p_adjustment, perf_rec['P'], 
-                                                            confidence, 
-                                                            self.confidence_weights['performance'] * 1.5)
-                        i_adjustment = self._weighted_combine(i_adjustment, perf_rec['I'], 
-                                                            confidence, 
-                                                            self.confidence_weights['performance'] * 1.5)
-                        d_adjustment = self._weighted_combine(d_adjustment, perf_rec['D'], 
-                                                            confidence, 
-                                                            self.confidence_weights['performance'] * 1.5)
+                        adjustments = weighted_combine(adjustments, [perf_rec['P'], perf_rec['I'], perf_rec['D']],
+                                                        confidence, w_performance_boost)
                         recommendations_text.extend(perf_text)
-                        confidence += self.confidence_weights['performance']
+                        increase |= perf_rec['increase']
+                        decrease |= perf_rec['decrease']
+                        confidence += w_performance
             
             # Round adjustments to integer values
-            p_adjustment = round(p_adjustment)
-            i_adjustment = round(i_adjustment)
-            d_adjustment = round(d_adjustment)
+            p_adjustment, i_adjustment, d_adjustment = (int(value) for value in np.round(adjustments))
             
             # Resolve conflicts and add explanation
-            conflict_explanation = self._resolve_conflicts(recommendations_text, p_adjustment, i_adjustment, d_adjustment)
+            conflict_explanation = self._resolve_conflicts(increase, decrease, p_adjustment, i_adjustment, d_adjustment)
             if conflict_explanation:
                 recommendations_text.append(conflict_explanation)
             
             # Store the recommendations
-            recommendations[axis] = {
+            axis_recommendations = recommendations[axis] = {
                 'P': p_adjustment,
                 'I': i_adjustment,
                 'D': d_adjustment,
                 'error_metrics': {
-                    'mean': np.mean(aggregated[axis]['error_mean']),
-                    'rms': np.mean(aggregated[axis]['error_rms']),
-                    'peak': np.mean(aggregated[axis]['error_peak'])
+                    'mean': averages['error_mean'],
+                    'rms': averages['error_rms'],
+                    'peak': averages['error_peak']
                 },
                 'confidence': min(confidence, 1.0)  # Cap confidence at 100%
             }
             
-            if aggregated[axis]['peak_freq']:
-                recommendations[axis]['frequency'] = {
-                    'peak_freq': np.mean(aggregated[axis]['peak_freq']),
-                    'peak_power': np.mean(aggregated[axis]['peak_power'])
+            if averages['peak_freq'] is not None:
+                axis_recommendations['frequency'] = {
+                    'peak_freq': averages['peak_freq'],
+                    'peak_power': averages['peak_power']
                 }
                 
             # Add prioritization recommendation
             priority_term, priority_reason = self._prioritize_adjustment(p_adjustment, i_adjustment, d_adjustment, axis)
             
             # Determine if the tune is good or not
-            is_well_tuned = (abs(p_adjustment) <= 5 and abs(i_adjustment) <= 5 and abs(d_adjustment) <= 5)
+            p_magnitude, i_magnitude, d_magnitude = abs(p_adjustment), abs(i_adjustment), abs(d_adjustment)
+            is_well_tuned = p_magnitude <= 5 and i_magnitude <= 5 and d_magnitude <= 5
             
             # Create a simplified summary focused on what to change
+            terms = {
+                'P': (p_adjustment, p_magnitude),
+                'I': (i_adjustment, i_magnitude),
+                'D': (d_adjustment, d_magnitude)
+            }
             simple_summary = []
             if is_well_tuned:
-                simple_summary.append(f"Your {axis.upper()} axis appears to be well-tuned! No significant adjustments needed.")
+                simple_summary.append(_WELL_TUNED[axis])
                 # Add reasons why it's considered well-tuned
-                if aggregated[axis]['error_rms'] and np.mean(aggregated[axis]['error_rms']) < 10:
-                    simple_summary.append(f"- Low tracking error (RMS: {np.mean(aggregated[axis]['error_rms']):.1f})")
-                if 'peak_power' in aggregated[axis] and aggregated[axis]['peak_power'] and np.mean(aggregated[axis]['peak_power']) < 100:
-                    simple_summary.append(f"- Low oscillations (power: {np.mean(aggregated[axis]['peak_power']):.1f})")
+                if averages['error_rms'] < 10:
+                    simple_summary.append(f"- Low tracking error (RMS: {averages['error_rms']:.1f})")
+                if averages['peak_power'] is not None and averages['peak_power'] < 100:
+                    simple_summary.append(f"- Low oscillations (power: {averages['peak_power']:.1f})")
             else:
                 # Create an actionable summary
                 if priority_term:
                     # Add the primary recommendation with WHAT and WHY
-                    if priority_term == 'P':
-                        adjustment = p_adjustment
-                    elif priority_term == 'I':
-                        adjustment = i_adjustment
-                    else:  # D term
-                        adjustment = d_adjustment
-                        
+                    adjustment, magnitude = terms[priority_term]
                     direction = "Increase" if adjustment > 0 else "Decrease"
-                    simple_summary.append(f"RECOMMENDED ACTION: {direction} {priority_term} by {abs(adjustment)}% [Adjust first]")
+                    simple_summary.append(f"RECOMMENDED ACTION: {direction} {priority_term} by {magnitude}% [Adjust first]")
                     simple_summary.append(f"- {priority_reason}")
                     
                     # Add secondary adjustments if significant
-                    if priority_term != 'P' and abs(p_adjustment) > 5:
-                        simple_summary.append(f"- After testing, also {'increase' if p_adjustment > 0 else 'decrease'} P by {abs(p_adjustment)}%")
-                    if priority_term != 'I' and abs(i_adjustment) > 5:
-                        simple_summary.append(f"- After testing, also {'increase' if i_adjustment > 0 else 'decrease'} I by {abs(i_adjustment)}%")
-                    if priority_term != 'D' and abs(d_adjustment) > 5:
-                        simple_summary.append(f"- After testing, also {'increase' if d_adjustment > 0 else 'decrease'} D by {abs(d_adjustment)}%")
+                    for term, (value, magnitude) in terms.items():
+                        if term != priority_term and magnitude > 5:
+                            direction = 'increase' if value > 0 else 'decrease'
+                            simple_summary.append(f"- After testing, also {direction} {term} by {magnitude}%")
                 else:
                     # Generic tune is off but no priority identified
-                    simple_summary.append(f"Your {axis.upper()} axis tuning could be improved, but only minor adjustments are recommended:")
-                    if p_adjustment != 0:
-                        simple_summary.append(f"- {'Increase' if p_adjustment > 0 else 'Decrease'} P by {abs(p_adjustment)}%")
-                    if i_adjustment != 0:
-                        simple_summary.append(f"- {'Increase' if i_adjustment > 0 else 'Decrease'} I by {abs(i_adjustment)}%")
-                    if d_adjustment != 0:
-                        simple_summary.append(f"- {'Increase' if d_adjustment > 0 else 'Decrease'} D by {abs(d_adjustment)}%")
+                    simple_summary.append(_MINOR_ADJUSTMENTS[axis])
+                    for term, (value, magnitude) in terms.items():
+                        if value != 0:
+                            direction = 'Increase' if value > 0 else 'Decrease'
+                            simple_summary.append(f"- {direction} {term} by {magnitude}%")
             
             # Add the summary to the recommendations
-            recommendations[axis]['simple_summary'] = simple_summary
+            axis_recommendations['simple_summary'] = simple_summary
             
             # Add confidence level to recommendations text
             confidence_percent = min(confidence, 1.0) * 100
             confidence_text = f"Recommendation confidence: {confidence_percent:.0f}%"
             if has_advanced:
                 if confidence_percent >= 80:
-                    confidence_text += " (High - based on comprehensive analysis)"
+                    confidence_text += _CONFIDENCE_HIGH
                 elif confidence_percent >= 60:
-                    confidence_text += " (Medium - based on multiple analysis methods)"
+                    confidence_text += _CONFIDENCE_MEDIUM
                 else:
-                    confidence_text += " (Low - limited analysis available)"
+                    confidence_text += _CONFIDENCE_LOW
             else:
-                confidence_text += " (Based on basic analysis only)"
+                confidence_text += _CONFIDENCE_BASIC
                 
             all_recommendations_text[axis] = recommendations_text
             all_recommendations_text[axis].append(confidence_text)
             
             # Print out recommendations for the axis
-            self._print_recommendations(axis, recommendations[axis], recommendations_text)
+            self._print_recommendations(axis, axis_recommendations, recommendations_text)
         
-        # Print a clear bottom line summary for all axes
-        print("\n" + "="*50)
-        print("SUMMARY: WHAT TO CHANGE")
-        print("="*50)
-        for axis in ['roll', 'pitch', 'yaw']:
+        # Print a clear bottom line summary for all axes. The summaries stay lists
+        # of lines (the HTML report reads them line by line) and are joined into
+        # a single block for printing.
+        summary_lines = ["\n" + "="*50, "SUMMARY: WHAT TO CHANGE", "="*50]
+        for axis in _AXES:
             if axis in recommendations:
-                print(f"\n{axis.upper()} AXIS:")
-                for line in recommendations[axis]['simple_summary']:
-                    print(line)
+                summary_lines.append(f"\n{axis.upper()} AXIS:")
+                summary_lines.extend(recommendations[axis]['simple_summary'])
+        print("\n".join(summary_lines))
         
         return recommendations, all_recommendations_text
     
     def _aggregate_basic_results(self, analysis_results):
-        """Aggregate basic analysis results across all segments"""
-        aggregated = {
-            'roll': {
-                'error_mean': [],
-                'error_rms': [],
-                'error_peak': [],
-                'peak_freq': [],
-                'peak_power': []
-            },
-            'pitch': {
-                'error_mean': [],
-                'error_rms': [],
-                'error_peak': [],
-                'peak_freq': [],
-                'peak_power': []
-            },
-            'yaw': {
-                'error_mean': [],
-                'error_rms': [],
-                'error_peak': [],
-                'peak_freq': [],
-                'peak_power': []
-            }
-        }
+        """
+        Aggregate basic analysis results across all segments
+        
+        Args:
+            analysis_results: Dictionary with analysis results for each segment and axis
+            
+        Returns:
+            Float64 array of shape (axes, segments, metrics), with axes in _AXES
+            order, metrics in BasicAggregate field order and NaN where a segment
+            has no data for an axis
+        """
+        segments = list(analysis_results.values())
+        metrics = np.full((len(_AXES), len(segments), len(BasicAggregate._fields)), np.nan)
         
         # Collect data from all segments
-        for axis in ['roll', 'pitch', 'yaw']:
-            for segment_id, segment_data in analysis_results.items():
-                if axis in segment_data:
-                    axis_data = segment_data[axis]
-                    
-                    aggregated[axis]['error_mean'].append(axis_data['error_metrics']['mean'])
-                    aggregated[axis]['error_rms'].append(axis_data['error_metrics']['rms'])
-                    aggregated[axis]['error_peak'].append(axis_data['error_metrics']['peak'])
-                    
-                    if 'frequency_analysis' in axis_data:
-                        aggregated[axis]['peak_freq'].append(axis_data['frequency_analysis']['peak_freq'])
-                        aggregated[axis]['peak_power'].append(axis_data['frequency_analysis']['peak_power'])
+        for j, segment_data in enumerate(segments):
+            for k, axis in enumerate(_AXES):
+                axis_data = segment_data.get(axis)
+                if axis_data is None:
+                    continue
+                
+                row = metrics[k, j]
+                error_metrics = axis_data['error_metrics']
+                row[:3] = error_metrics['mean'], error_metrics['rms'], error_metrics['peak']
+                
+                frequency_analysis = axis_data.get('frequency_analysis')
+                if frequency_analysis is not None:
+                    row[3:] = frequency_analysis['peak_freq'], frequency_analysis['peak_power']
         
-        return aggregated
+        return metrics
     
     def _aggregate_advanced_results(self, advanced_results):
         """Aggregate advanced analysis results across all segments"""
@@ -273,90 +331,133 @@ class PIDRecommender:
         # Process each axis and segment
         for plot_key, data in advanced_results.items():
             # Extract axis and segment_id from plot_key (format: "{segment_id}_{axis}")
-            segment_id, axis = plot_key.split('_')
-            
-            if axis not in aggregated:
-                aggregated[axis] = {}
+            segment_id, axis = plot_key.rsplit('_', 1)
+            axis_results = aggregated.setdefault(axis, {})
             
             # For each analysis type, store the results
-            for analysis_type in ['transfer_function', 'arx_model', 'wavelet', 'performance']:
+            for analysis_type in _ANALYSIS_TYPES:
                 if analysis_type in data:
-                    if analysis_type not in aggregated[axis]:
-                        aggregated[axis][analysis_type] = []
-                    aggregated[axis][analysis_type].append(data[analysis_type])
+                    axis_results.setdefault(analysis_type, []).append(data[analysis_type])
         
         return aggregated
     
-    def _generate_basic_recommendations(self, aggregated, axis):
-        """Generate recommendations based on basic metrics"""
-        # Calculate averages
-        avg_error_mean = np.mean(aggregated[axis]['error_mean'])
-        avg_error_rms = np.mean(aggregated[axis]['error_rms'])
-        avg_error_peak = np.mean(aggregated[axis]['error_peak'])
+    @staticmethod
+    def _axis_means(values):
+        """
+        Average stacked per-axis values over segments, ignoring missing (NaN) ones
         
-        # Initialize recommendations
-        p_adjustment = 0
-        i_adjustment = 0
-        d_adjustment = 0
-        recommendations_text = []
+        Args:
+            values: Array of shape (axes, segments, ...)
+            
+        Returns:
+            Tuple of (means, counts), each of shape (axes, ...); the mean is NaN
+            where an axis has no values
+        """
+        counts = np.count_nonzero(~np.isnan(values), axis=1)
+        with np.errstate(invalid='ignore'):
+            means = np.nansum(values, axis=1) / counts
+        return means, counts
+    
+    def _generate_basic_recommendations(self, aggregated):
+        """
+        Generate recommendations based on basic metrics
+        
+        The thresholds are evaluated for all axes at once; only the text is
+        built per axis. The averaged metrics are returned under 'averages'
+        alongside the adjustments so the caller can report them without
+        recomputing.
+        
+        Args:
+            aggregated: Metrics array from _aggregate_basic_results
+            
+        Returns:
+            Dictionary mapping each axis with data to a tuple of
+            (recommendations dictionary, recommendations text list)
+        """
+        # Calculate all averages in one reduction over segments
+        means, counts = self._axis_means(aggregated)
+        avg_error_mean, avg_error_rms, avg_error_peak, avg_peak_freq, avg_peak_power = means.T
+        counts = BasicAggregate(*counts.T)
+        error_counts = counts.error_mean
+        has_freq = counts.peak_freq > 0
         
         # P-term recommendations based on tracking error
-        if avg_error_rms > 50:
-            p_adjustment += 15
-            recommendations_text.append(f"High RMS error ({avg_error_rms:.1f}): Consider increasing P by ~15%")
-        elif avg_error_rms < 10:
-            recommendations_text.append("Good tracking performance")
+        high_rms = avg_error_rms > 50
+        low_rms = avg_error_rms < 10
+        
+        # Oscillations: high frequency often indicates too much D, low frequency
+        # too much P or too little D, and medium frequency with high power too much P
+        high_osc = has_freq & (avg_peak_freq > 30) & (avg_peak_power > 1000)
+        low_osc = has_freq & ~high_osc & (avg_peak_freq < 10) & (avg_peak_power > 1000)
+        mid_osc = (has_freq & ~high_osc & ~low_osc & (10 <= avg_peak_freq) & (avg_peak_freq <= 30)
+                   & (avg_peak_power > 2000))
+        
+        # I-term recommendations based on persistent error
+        high_mean = avg_error_mean > 30
         
-        # Check for oscillations
-        if aggregated[axis]['peak_freq']:
-            avg_peak_freq = np.mean(aggregated[axis]['peak_freq'])
-            avg_peak_power = np.mean(aggregated[axis]['peak_power'])
+        p_adjustment = 15 * high_rms - 10 * low_osc - 10 * mid_osc
+        i_adjustment = 20 * high_mean
+        d_adjustment = 15 * low_osc - 20 * high_osc
+        balanced = (np.abs(p_adjustment) < 5) & (np.abs(i_adjustment) < 5) & (np.abs(d_adjustment) < 5)
+        
+        results = {}
+        for k, axis in enumerate(_AXES):
+            # Skip if no data for this axis
+            if not error_counts[k]:
+                continue
             
-            # High frequency oscillations often indicate too much D
-            if avg_peak_freq > 30 and avg_peak_power > 1000:
-                d_adjustment -= 20
+            recommendations_text = []
+            
+            if high_rms[k]:
+                recommendations_text.append(f"High RMS error ({avg_error_rms[k]:.1f}): Consider increasing P by ~15%")
+            elif low_rms[k]:
+                recommendations_text.append("Good tracking performance")
+            
+            if high_osc[k]:
                 recommendations_text.append(
-                    f"High frequency oscillations detected ({avg_peak_freq:.1f}Hz): Consider reducing D by ~20%"
+                    f"High frequency oscillations detected ({avg_peak_freq[k]:.1f}Hz): Consider reducing D by ~20%"
                 )
-            
-            # Low frequency oscillations often indicate too much P or too little D
-            elif avg_peak_freq < 10 and avg_peak_power > 1000:
-                p_adjustment -= 10
-                d_adjustment += 15
+            elif low_osc[k]:
                 recommendations_text.append(
-                    f"Low frequency oscillations detected ({avg_peak_freq:.1f}Hz): "
+                    f"Low frequency oscillations detected ({avg_peak_freq[k]:.1f}Hz): "
                     f"Consider reducing P by ~10% and increasing D by ~15%"
                 )
-            
-            # Medium frequency with high power might indicate too much P
-            elif 10 <= avg_peak_freq <= 30 and avg_peak_power > 2000:
-                p_adjustment -= 10
+            elif mid_osc[k]:
                 recommendations_text.append(
-                    f"Medium frequency oscillations detected ({avg_peak_freq:.1f}Hz): "
+                    f"Medium frequency oscillations detected ({avg_peak_freq[k]:.1f}Hz): "
                     f"Consider reducing P by ~10%"
                 )
+            
+            if high_mean[k]:
+                recommendations_text.append(
+                    f"High average error ({avg_error_mean[k]:.1f}): Consider increasing I by ~20%"
+                )
+            
+            # Additional notes
+            if balanced[k]:
+                recommendations_text.append("Current tune appears to be well-balanced based on basic metrics.")
+            
+            if avg_error_peak[k] > 100:
+                recommendations_text.append(
+                    "High peak errors detected. This could indicate mechanical issues or extreme maneuvers."
+                )
+            
+            results[axis] = ({
+                'P': int(p_adjustment[k]),
+                'I': int(i_adjustment[k]),
+                'D': int(d_adjustment[k]),
+                'increase': {term for term, flag in (('P', high_rms[k]), ('I', high_mean[k]), ('D', low_osc[k])) if flag},
+                'decrease': {term for term, flag in (('P', low_osc[k] or mid_osc[k]), ('D', high_osc[k])) if flag},
+                'averages': {
+                    'error_mean': avg_error_mean[k],
+                    'error_rms': avg_error_rms[k],
+                    'error_peak': avg_error_peak[k],
+                    'peak_freq': avg_peak_freq[k] if has_freq[k] else None,
+                    'peak_power': avg_peak_power[k] if has_freq[k] else None
+                }
+            }, recommendations_text)
         
-        # I-term recommendations based on persistent error
-        if avg_error_mean > 30:
-            i_adjustment += 20
-            recommendations_text.append(
-                f"High average error ({avg_error_mean:.1f}): Consider increasing I by ~20%"
-            )
-        
-        # Additional notes
-        if abs(p_adjustment) < 5 and abs(i_adjustment) < 5 and abs(d_adjustment) < 5:
-            recommendations_text.append("Current tune appears to be well-balanced based on basic metrics.")
-        
-        if avg_error_peak > 100:
-            recommendations_text.append(
-                "High peak errors detected. This could indicate mechanical issues or extreme maneuvers."
-            )
-        
-        return {
-            'P': p_adjustment,
-            'I': i_adjustment,
-            'D': d_adjustment
-        }, recommendations_text
+        return results
     
     def _generate_tf_recommendations(self, tf_data_list, axis):
         """
@@ -373,10 +474,12 @@ class PIDRecommender:
         p_adjustment = 0
         d_adjustment = 0
         recommendations_text = []
+        increase, decrease = set(), set()
         
         # Calculate average phase margin and resonant frequencies
         phase_margins = []
         resonant_freqs = []
+        resonant_mags = []
         coherence_values = []
         
         for tf_data in tf_data_list:
@@ -385,31 +488,37 @@ class PIDRecommender:
             
             if 'resonant_frequencies' in tf_data and tf_data['resonant_frequencies']:
                 # Extract frequencies and magnitudes
-                for freq, mag in tf_data['resonant_frequencies']:
-                    resonant_freqs.append((freq, mag))
+                freqs, mags = zip(*tf_data['resonant_frequencies'])
+                resonant_freqs.extend(freqs)
+                resonant_mags.extend(mags)
             
-            # Calculate average coherence at low frequencies (0-20Hz)
+            # Calculate average coherence at low frequencies (0-20Hz). The
+            # frequencies are sorted, so the band is a slice found by bisection.
             freqs = tf_data['frequencies']
             coherence = tf_data['coherence']
-            low_freq_mask = (freqs > 0) & (freqs < 20)
-            if np.any(low_freq_mask):
-                avg_coherence = np.mean(coherence[low_freq_mask])
+            lo = np.searchsorted(freqs, 0, side='right')
+            hi = np.searchsorted(freqs, 20, side='left')
+            if hi > lo:
+                avg_coherence = coherence[lo:hi].mean()
                 coherence_values.append(avg_coherence)
         
         # Analyze phase margin
         if phase_margins:
-            avg_phase_margin = np.mean(phase_margins)
+            avg_phase_margin = _mean(phase_margins)
             
             # Ideal phase margin is 45-60 degrees
             if avg_phase_margin < 30:
                 p_adjustment -= 15
                 d_adjustment += 20
+                decrease.add('P')
+                increase.add('D')
                 recommendations_text.append(
                     f"Low phase margin ({avg_phase_margin:.1f}°): Reduce P by ~15% and increase D by ~20% "
                     f"to improve stability"
                 )
             elif avg_phase_margin > 70:
                 p_adjustment += 10
+                increase.add('P')
                 recommendations_text.append(
                     f"High phase margin ({avg_phase_margin:.1f}°): System is overdamped, "
                     f"consider increasing P by ~10% for better responsiveness"
@@ -421,34 +530,41 @@ class PIDRecommender:
         
         # Analyze resonant frequencies
         if resonant_freqs:
-            # Group by frequency range
-            low_res = [m for f, m in resonant_freqs if f < 10]
-            mid_res = [m for f, m in resonant_freqs if 10 <= f < 30]
-            high_res = [m for f, m in resonant_freqs if f >= 30]
+            # Group by frequency range (0: below 10Hz, 1: 10-30Hz, 2: 30Hz and up)
+            # and take the strongest resonance in each
+            resonant_mags = np.asarray(resonant_mags, dtype=np.float64)
+            bins = np.digitize(np.asarray(resonant_freqs, dtype=np.float64), [10.0, 30.0])
+            low_max = resonant_mags[bins == 0].max(initial=-np.inf)
+            mid_max = resonant_mags[bins == 1].max(initial=-np.inf)
+            high_max = resonant_mags[bins == 2].max(initial=-np.inf)
             
             # Check for strong resonances
-            if low_res and np.max(low_res) > 3.0:
+            if low_max > 3.0:
                 p_adjustment -= 15
+                decrease.add('P')
                 recommendations_text.append(
                     f"Strong low-frequency resonance detected: Consider reducing P by ~15%"
                 )
             
-            if mid_res and np.max(mid_res) > 2.5:
+            if mid_max > 2.5:
                 p_adjustment -= 10
                 d_adjustment += 10
+                decrease.add('P')
+                increase.add('D')
                 recommendations_text.append(
                     f"Mid-frequency resonance detected: Consider reducing P by ~10% and increasing D by ~10%"
                 )
             
-            if high_res and np.max(high_res) > 2.0:
+            if high_max > 2.0:
                 d_adjustment -= 20
+                decrease.add('D')
                 recommendations_text.append(
                     f"High-frequency resonance detected: Consider reducing D by ~20%"
                 )
         
         # Analyze coherence
         if coherence_values:
-            avg_coherence = np.mean(coherence_values)
+            avg_coherence = _mean(coherence_values)
             if avg_coherence < 0.5:
                 recommendations_text.append(
                     f"Low input-output coherence ({avg_coherence:.2f}): System behavior is nonlinear or "
@@ -462,7 +578,9 @@ class PIDRecommender:
         
         return {
             'P': p_adjustment,
-            'D': d_adjustment
+            'D': d_adjustment,
+            'increase': increase,
+            'decrease': decrease
         }, recommendations_text
     
     def _generate_arx_model_recommendations(self, arx_data_list, axis):
@@ -481,10 +599,11 @@ class PIDRecommender:
         i_adjustment = 0
         d_adjustment = 0
         recommendations_text = []
+        increase, decrease = set(), set()
         
         # Calculate average fit quality
         fit_values = [data['fit'] for data in arx_data_list]
-        avg_fit = np.mean(fit_values) if fit_values else 0
+        avg_fit = _mean(fit_values)
         
         # If fit quality is low, recommendations may be less reliable
         if avg_fit < 40:
@@ -494,67 +613,48 @@ class PIDRecommender:
             return {
                 'P': 0,
                 'I': 0,
-                'D': 0
+                'D': 0,
+                'increase': increase,
+                'decrease': decrease
             }, recommendations_text
         
-        # Analyze step responses
+        # Analyze step responses, batching responses of equal length together
         rise_times = []
         settling_times = []
         overshoots = []
         
+        responses_by_length = {}
         for data in arx_data_list:
-            step_response = data['step_response']
-            steady_state = np.mean(step_response[-20:])
-            
-            # Skip if steady state is too close to zero
-            if abs(steady_state) < 1e-6:
-                continue
-            
-            # Calculate rise time (10% to 90%)
-            try:
-                rise_10_idx = np.where(step_response >= 0.1 * steady_state)[0][0]
-                rise_90_idx = np.where(step_response >= 0.9 * steady_state)[0][0]
-                rise_time = rise_90_idx - rise_10_idx
-                rise_times.append(rise_time)
-            except:
-                pass
-            
-            # Calculate settling time
-            try:
-                settling_band = 0.05 * steady_state
-                for i in range(len(step_response) - 30):
-                    if all(abs(step_response[i+j] - steady_state) <= settling_band for j in range(30)):
-                        settling_times.append(i)
-                        break
-            except:
-                pass
-            
-            # Calculate overshoot
-            try:
-                if rise_90_idx and rise_90_idx < len(step_response) - 1:
-                    max_response = np.max(step_response[rise_90_idx:])
-                    overshoot = (max_response - steady_state) / abs(steady_state) * 100
-                    overshoots.append(overshoot)
-            except:
-                pass
+            step_response = np.asarray(data['step_response'], dtype=np.float64)
+            if len(step_response):
+                responses_by_length.setdefault(len(step_response), []).append(step_response)
+        
+        for responses in responses_by_length.values():
+            rise, settling, overshoot = _step_response_features(np.vstack(responses))
+            rise_times.extend(rise.tolist())
+            settling_times.extend(settling.tolist())
+            overshoots.extend(overshoot.tolist())
         
         # Generate recommendations based on rise time
         if rise_times:
-            avg_rise_time = np.mean(rise_times)
+            avg_rise_time = _mean(rise_times)
             if avg_rise_time > 20:  # Very slow response
                 p_adjustment += 25
+                increase.add('P')
                 recommendations_text.append(
                     f"Slow system response (rise time: {avg_rise_time:.1f} samples): "
                     f"Consider increasing P by ~25%"
                 )
             elif avg_rise_time > 10:  # Moderately slow response
                 p_adjustment += 15
+                increase.add('P')
                 recommendations_text.append(
                     f"Moderate system response (rise time: {avg_rise_time:.1f} samples): "
                     f"Consider increasing P by ~15%"
                 )
             elif avg_rise_time < 3:  # Very fast response
                 p_adjustment -= 10
+                decrease.add('P')
                 recommendations_text.append(
                     f"Very fast system response (rise time: {avg_rise_time:.1f} samples): "
                     f"Consider decreasing P by ~10%"
@@ -562,10 +662,12 @@ class PIDRecommender:
         
         # Generate recommendations based on overshoot
         if overshoots:
-            avg_overshoot = np.mean(overshoots)
+            avg_overshoot = _mean(overshoots)
             if avg_overshoot > 30:  # High overshoot
                 p_adjustment -= 20
                 d_adjustment += 15
+                decrease.add('P')
+                increase.add('D')
                 recommendations_text.append(
                     f"High system overshoot ({avg_overshoot:.1f}%): "
                     f"Consider decreasing P by ~20% and increasing D by ~15%"
@@ -573,12 +675,15 @@ class PIDRecommender:
             elif avg_overshoot > 15:  # Moderate overshoot
                 p_adjustment -= 10
                 d_adjustment += 10
+                decrease.add('P')
+                increase.add('D')
                 recommendations_text.append(
                     f"Moderate system overshoot ({avg_overshoot:.1f}%): "
                     f"Consider decreasing P by ~10% and increasing D by ~10%"
                 )
             elif avg_overshoot < 5:  # Low overshoot
                 p_adjustment += 5
+                increase.add('P')
                 recommendations_text.append(
                     f"Low system overshoot ({avg_overshoot:.1f}%): "
                     f"Consider increasing P by ~5% for better responsiveness"
@@ -586,15 +691,17 @@ class PIDRecommender:
         
         # Generate recommendations based on settling time
         if settling_times:
-            avg_settling_time = np.mean(settling_times)
+            avg_settling_time = _mean(settling_times)
             if avg_settling_time > 50:  # Very slow settling
                 i_adjustment += 20
+                increase.add('I')
                 recommendations_text.append(
                     f"Slow system settling (settling time: {avg_settling_time:.1f} samples): "
                     f"Consider increasing I by ~20%"
                 )
             elif avg_settling_time > 30:  # Moderately slow settling
                 i_adjustment += 10
+                increase.add('I')
                 recommendations_text.append(
                     f"Moderate system settling (settling time: {avg_settling_time:.1f} samples): "
                     f"Consider increasing I by ~10%"
@@ -608,7 +715,9 @@ class PIDRecommender:
         return {
             'P': p_adjustment,
             'I': i_adjustment,
-            'D': d_adjustment
+            'D': d_adjustment,
+            'increase': increase,
+            'decrease': decrease
         }, recommendations_text
     
     def _generate_performance_recommendations(self, perf_data_list, axis):
@@ -627,6 +736,7 @@ class PIDRecommender:
         i_adjustment = 0
         d_adjustment = 0
         recommendations_text = []
+        increase, decrease = set(), set()
         
         # Check if there's valid performance data
         if not perf_data_list or len(perf_data_list) == 0:
@@ -636,24 +746,23 @@ class PIDRecommender:
             return {
                 'P': 0,
                 'I': 0,
-                'D': 0
+                'D': 0,
+                'increase': increase,
+                'decrease': decrease,
+                'averages': {'tracking': 0.0, 'performance': 0.0}
             }, recommendations_text
         
-        # Calculate average performance metrics
-        tracking_scores = [data.get('tracking_score', 0) for data in perf_data_list]
-        noise_scores = [data.get('noise_score', 0) for data in perf_data_list]
-        response_scores = [data.get('response_score', 0) for data in perf_data_list]
-        performance_indices = [data.get('performance_index', 0) for data in perf_data_list]
-        
-        avg_tracking = np.mean(tracking_scores) if tracking_scores else 0
-        avg_noise = np.mean(noise_scores) if noise_scores else 0
-        avg_response = np.mean(response_scores) if response_scores else 0
-        avg_performance = np.mean(performance_indices) if performance_indices else 0
+        # Calculate average performance metrics, extracting all scores in one pass
+        scores = np.array([[data.get(key, 0) for key in _PERFORMANCE_SCORES] for data in perf_data_list],
+                          dtype=np.float64)
+        avg_tracking, avg_noise, avg_response, avg_performance = scores.mean(axis=0)
         
         # Generate recommendations based on tracking score
         if avg_tracking < 40:  # Very poor tracking
             p_adjustment += 25
             i_adjustment += 15
+            increase.add('P')
+            increase.add('I')
             recommendations_text.append(
                 f"Very poor tracking performance (score: {avg_tracking:.1f}): "
                 f"Consider increasing P by ~25% and I by ~15%"
@@ -661,6 +770,8 @@ class PIDRecommender:
         elif avg_tracking < 60:  # Poor tracking
             p_adjustment += 15
             i_adjustment += 10
+            increase.add('P')
+            increase.add('I')
             recommendations_text.append(
                 f"Poor tracking performance (score: {avg_tracking:.1f}): "
                 f"Consider increasing P by ~15% and I by ~10%"
@@ -673,12 +784,14 @@ class PIDRecommender:
         # Generate recommendations based on noise score
         if avg_noise < 40:  # High noise
             d_adjustment -= 25
+            decrease.add('D')
             recommendations_text.append(
                 f"High noise/vibration detected (score: {avg_noise:.1f}): "
                 f"Consider reducing D by ~25%"
             )
         elif avg_noise < 60:  # Moderate noise
             d_adjustment -= 15
+            decrease.add('D')
             recommendations_text.append(
                 f"Moderate noise/vibration detected (score: {avg_noise:.1f}): "
                 f"Consider reducing D by ~15%"
@@ -692,12 +805,15 @@ class PIDRecommender:
         if avg_response < 40:  # Poor responsiveness
             p_adjustment += 20
             d_adjustment -= 10
+            increase.add('P')
+            decrease.add('D')
             recommendations_text.append(
                 f"Poor responsiveness (score: {avg_response:.1f}): "
                 f"Consider increasing P by ~20% and reducing D by ~10%"
             )
         elif avg_response < 60:  # Moderate responsiveness
             p_adjustment += 10
+            increase.add('P')
             recommendations_text.append(
                 f"Moderate responsiveness (score: {avg_response:.1f}): "
                 f"Consider increasing P by ~10%"
@@ -723,22 +839,29 @@ class PIDRecommender:
         return {
             'P': p_adjustment,
             'I': i_adjustment,
-            'D': d_adjustment
+            'D': d_adjustment,
+            'increase': increase,
+            'decrease': decrease,
+            'averages': {'tracking': avg_tracking, 'performance': avg_performance}
         }, recommendations_text
     
-    def _weighted_combine(self, value1, value2, weight1, weight2):
+    @staticmethod
+    def _weighted_combine(value1, value2, weight1, weight2):
         """
         Combine two values using weighted average with safeguards
         
         Args:
-            value1: First value 
-            value2: Second value
+            value1: First value, or array of values (e.g. P/I/D adjustments)
+            value2: Second value, or array of values matching value1
             weight1: Weight for first value
             weight2: Weight for second value
             
         Returns:
-            Weighted average of the two values
+            Weighted average of the two values (elementwise for arrays)
         """
+        value1 = np.asarray(value1, dtype=np.float64)
+        value2 = np.asarray(value2, dtype=np.float64)
+        
         # Ensure weights are positive
         weight1 = max(0, weight1)
         weight2 = max(0, weight2)
@@ -755,20 +878,18 @@ class PIDRecommender:
         
         # When values have opposite signs (conflicting recommendations),
         # prioritize larger magnitude with higher weight
-        if value1 * value2 < 0:
-            # If one value's magnitude is significantly larger and has higher weight,
-            # bias towards that value more
-            mag1 = abs(value1)
-            mag2 = abs(value2)
-            
-            if mag1 > 2 * mag2 and weight1 >= weight2:
-                # Value1 is dominant in magnitude and weight
-                result = 0.8 * value1 + 0.2 * result
-            elif mag2 > 2 * mag1 and weight2 >= weight1:
-                # Value2 is dominant in magnitude and weight
-                result = 0.8 * value2 + 0.2 * result
-        
-        return result
+        opposite = value1 * value2 < 0
+        mag1 = np.abs(value1)
+        mag2 = np.abs(value2)
+        
+        # If one value's magnitude is significantly larger and it has the higher
+        # (or equal) weight, bias towards that value more. At most one value can
+        # dominate, so both cases are applied in a single select.
+        favor1 = opposite & (mag1 > 2 * mag2) & (weight1 >= weight2)
+        favor2 = opposite & (mag2 > 2 * mag1) & (weight2 >= weight1)
+        dominant = np.where(favor1, value1, value2)
+        
+        return np.where(favor1 | favor2, 0.8 * dominant + 0.2 * result, result)
     
     def _print_recommendations(self, axis, recommendations, text):
         """Print detailed recommendations for an axis"""
@@ -795,12 +916,13 @@ class PIDRecommender:
         print(f"I: {recommendations['I']:+d}%")
         print(f"D: {recommendations['D']:+d}%")
     
-    def _resolve_conflicts(self, recommendations_text, p_adjustment, i_adjustment, d_adjustment):
+    def _resolve_conflicts(self, increase, decrease, p_adjustment, i_adjustment, d_adjustment):
         """
         Resolve conflicts between recommendations and add explanation
         
         Args:
-            recommendations_text: List of text recommendations
+            increase: Set of terms ('P', 'I', 'D') any recommendation suggested increasing
+            decrease: Set of terms any recommendation suggested decreasing
             p_adjustment: Final P adjustment percentage
             i_adjustment: Final I adjustment percentage
             d_adjustment: Final D adjustment percentage
@@ -808,15 +930,10 @@ class PIDRecommender:
         Returns:
             String with conflict explanation or None if no conflict detected
         """
-        # Check for conflicts by looking for contradictory phrases in recommendations
-        increase_p = any("increasing P" in rec.lower() for rec in recommendations_text)
-        decrease_p = any("reducing P" in rec.lower() or "decreasing P" in rec.lower() for rec in recommendations_text)
-        
-        increase_i = any("increasing I" in rec.lower() for rec in recommendations_text)
-        decrease_i = any("reducing I" in rec.lower() or "decreasing I" in rec.lower() for rec in recommendations_text)
-        
-        increase_d = any("increasing D" in rec.lower() for rec in recommendations_text)
-        decrease_d = any("reducing D" in rec.lower() or "decreasing D" in rec.lower() for rec in recommendations_text)
+        # Check for conflicts between the directions recommended for each term
+        increase_p, decrease_p = 'P' in increase, 'P' in decrease
+        increase_i, decrease_i = 'I' in increase, 'I' in decrease
+        increase_d, decrease_d = 'D' in increase, 'D' in decrease
         
         # Build explanation for P-term conflicts
         explanation = []
@@ -891,16 +1008,14 @@ class PIDRecommender:
         if p_adjustment == 0 and i_adjustment == 0 and d_adjustment == 0:
             return None, None
             
-        # Store the absolute magnitude of each adjustment
-        adjustments = {
-            'P': abs(p_adjustment),
-            'I': abs(i_adjustment),
-            'D': abs(d_adjustment)
-        }
-        
-        # Find the term with the largest adjustment 
-        max_term = max(adjustments, key=adjustments.get)
-        max_value = adjustments[max_term]
+        # Find the term with the largest adjustment magnitude, preferring P, then I on ties
+        p_magnitude, i_magnitude, d_magnitude = abs(p_adjustment), abs(i_adjustment), abs(d_adjustment)
+        if p_magnitude >= i_magnitude and p_magnitude >= d_magnitude:
+            max_term, max_value = 'P', p_magnitude
+        elif i_magnitude >= d_magnitude:
+            max_term, max_value = 'I', i_magnitude
+        else:
+            max_term, max_value = 'D', d_magnitude
         
         # If the largest adjustment is zero, return None
         if max_value == 0:
@@ -925,7 +1040,7 @@ class PIDRecommender:
                 
         # Special case: if D is negative with a significant value, prioritize it
         # as noise issues should often be addressed first
-        if d_adjustment < -10 and 'D' in adjustments and adjustments['D'] >= max_value * 0.7:
+        if d_adjustment < -10 and d_magnitude >= max_value * 0.7:
             max_term = 'D'
             reason = f"Decrease D by {abs(d_adjustment)}% to reduce noise amplification. Noise should be addressed before other tuning."
         
@@ -1,10 +1,11 @@
 """
 Module for flight segment identification and analysis
 """
+from concurrent.futures import ThreadPoolExecutor
 import numpy as np
 import pandas as pd
-from scipy import signal
 import matplotlib.pyplot as plt
+from betaflight_log_analyzer.utils.spectral import power_spectrum
 
 class FlightSegmentAnalyzer:
     """Class for identifying and analyzing flight segments"""
@@ -19,6 +20,47 @@ class FlightSegmentAnalyzer:
         """
         self.throttle_threshold = throttle_threshold
         self.min_segment_duration = min_segment_duration
+        self._bound_key = None
+        self._time = None
+        self._cols = {}
+        self._sample_rate = None
+    
+    def bind(self, df):
+        """
+        Extract the columns used by the analysis from a log once
+        
+        The time column, the sample rate and the rc, setpoint and gyro columns
+        (in single precision) are kept as NumPy arrays, so segments are sliced
+        as plain views without going through pandas. identify_segments and
+        analyze_segment bind the log they are given.
+        
+        Binding the same log again is a no-op. The log is recognised by its
+        identity, length and first and last time stamps rather than held on
+        to, so a log edited in place must be released before binding it
+        again. analyze_segments releases the columns when it returns.
+        
+        Args:
+            df: DataFrame containing log data
+        """
+        time = df['time']
+        key = (id(df), len(df)) + ((time.iat[0], time.iat[-1]) if len(df) else ())
+        if key == self._bound_key:
+            return
+        
+        self._time = df['time'].to_numpy()
+        self._sample_rate = 1.0 / (self._time[1] - self._time[0]) if len(self._time) > 1 else 1000.0
+        self._cols = {
+            name: np.asarray(df[name].to_numpy(), dtype=np.float32)
+            for name in df.columns if name.startswith(('rc_', 'setpoint_', 'gyro_'))
+        }
+        self._bound_key = key
+    
+    def release(self):
+        """Drop the columns extracted by bind"""
+        self._bound_key = None
+        self._time = None
+        self._cols = {}
+        self._sample_rate = None
     
     def identify_segments(self, df):
         """
@@ -36,27 +78,26 @@ class FlightSegmentAnalyzer:
             return [(0, len(df) - 1)]
         
         # Find segments where throttle is above threshold
-        throttle = df['rc_throttle'].values
+        self.bind(df)
+        throttle = self._cols['rc_throttle']
         active = throttle > self.throttle_threshold
         
-        # Find transitions
-        transitions = np.where(np.diff(active.astype(int)) != 0)[0] + 1
-        transitions = np.insert(transitions, 0, 0)
-        transitions = np.append(transitions, len(df))
+        # Find where active flight starts (rising edges) and stops (falling edges);
+        # a log that starts or ends in flight opens or closes a segment at its bounds
+        steps = np.diff(active.view(np.int8))
+        starts = np.flatnonzero(steps == 1) + 1
+        ends = np.flatnonzero(steps == -1) + 1
+        if len(active) and active[0]:
+            starts = np.concatenate(([0], starts))
+        if len(active) and active[-1]:
+            ends = np.concatenate((ends, [len(df)]))
         
         # Create segments
-        segments = []
-        sample_rate = 1.0 / (df['time'].iloc[1] - df['time'].iloc[0]) if len(df) > 1 else 1000.0
-        min_samples = int(self.min_segment_duration * sample_rate)
-        
-        for i in range(0, len(transitions) - 1, 2):
-            if i+1 < len(transitions):
-                start = transitions[i]
-                end = transitions[i+1]
-                
-                # Only include segments longer than min_segment_duration
-                if (end - start) > min_samples:
-                    segments.append((start, end))
+        min_samples = int(self.min_segment_duration * self._sample_rate)
+        
+        # Only include segments longer than min_segment_duration
+        keep = (ends - starts) > min_samples
+        segments = list(zip(starts[keep].tolist(), ends[keep].tolist()))
         
         if not segments:
             print("No active flight segments found. Analyzing entire log.")
@@ -76,48 +117,48 @@ class FlightSegmentAnalyzer:
         Returns:
             Dictionary with analysis results for each axis
         """
+        # Slice the bound columns as NumPy views rather than copying the
+        # segment's rows out of the DataFrame
+        self.bind(df)
+        cols = self._cols
         start, end = segment
-        segment_df = df.iloc[start:end].copy()
-        duration = segment_df['time'].iloc[-1] - segment_df['time'].iloc[0]
+        time_data = self._time[start:end]
+        duration = time_data[-1] - time_data[0]
+        fs = self._sample_rate
         
         results = {}
         axes = ['roll', 'pitch', 'yaw']
         
+        # Scratch buffer for the absolute tracking error, shared by all axes
+        abs_error = np.empty(len(time_data), dtype=np.float32)
+        
         for axis in axes:
             # Extract data
-            rc_data = segment_df[f'rc_{axis}'].values
-            setpoint_data = segment_df[f'setpoint_{axis}'].values
-            gyro_data = segment_df[f'gyro_{axis}'].values
-            time_data = segment_df['time'].values
+            rc_data = cols[f'rc_{axis}'][start:end]
+            setpoint_data = cols[f'setpoint_{axis}'][start:end]
+            gyro_data = cols[f'gyro_{axis}'][start:end]
             
-            # Basic statistics
-            rc_stats = {
-                'mean': np.mean(rc_data),
-                'std': np.std(rc_data),
-                'min': np.min(rc_data),
-                'max': np.max(rc_data)
-            }
-            
-            setpoint_stats = {
-                'mean': np.mean(setpoint_data),
-                'std': np.std(setpoint_data),
-                'min': np.min(setpoint_data),
-                'max': np.max(setpoint_data)
-            }
+            # Basic statistics, computed for all three signals at once on a
+            # (signals x samples) stack
+            stacked = np.stack([rc_data, setpoint_data, gyro_data])
+            means = stacked.mean(axis=1)
+            stds = stacked.std(axis=1)
+            mins = stacked.min(axis=1)
+            maxs = stacked.max(axis=1)
+            rc_stats, setpoint_stats, gyro_stats = (
+                {'mean': means[k], 'std': stds[k], 'min': mins[k], 'max': maxs[k]}
+                for k in range(3)
+            )
             
-            gyro_stats = {
-                'mean': np.mean(gyro_data),
-                'std': np.std(gyro_data),
-                'min': np.min(gyro_data),
-                'max': np.max(gyro_data)
-            }
-            
-            # Calculate tracking error
+            # Calculate tracking error. The sum of squares is a dot product and the
+            # absolute error is written once into the scratch buffer for both
+            # the mean and the peak.
             error = setpoint_data - gyro_data
+            np.abs(error, out=abs_error)
             error_metrics = {
-                'mean': np.mean(np.abs(error)),
-                'rms': np.sqrt(np.mean(np.square(error))),
-                'peak': np.max(np.abs(error))
+                'mean': abs_error.mean(),
+                'rms': np.sqrt(np.dot(error, error) / len(error)),
+                'peak': abs_error.max()
             }
             
             # Store results for this axis
@@ -134,21 +175,45 @@ class FlightSegmentAnalyzer:
                 'error': error
             }
             
-            # Frequency analysis if we have enough data
-            if len(gyro_data) > 1000:
-                fs = 1 / (time_data[1] - time_data[0])  # Sampling frequency
-                f, pxx = signal.welch(gyro_data, fs, nperseg=1024)
-                
-                # Find dominant frequency and its power
-                peak_idx = np.argmax(pxx)
-                peak_freq = f[peak_idx]
-                peak_power = pxx[peak_idx]
-                
+        # Frequency analysis if we have enough data, transforming all axes in one batch
+        if len(time_data) > 1000:
+            f, pxx = power_spectrum(np.stack([results[axis]['gyro'] for axis in axes]), fs, nperseg=1024)
+            
+            # Find dominant frequency and its power
+            peak_idx = np.argmax(pxx, axis=-1)
+            
+            for k, axis in enumerate(axes):
                 results[axis]['frequency_analysis'] = {
                     'frequencies': f,
-                    'power': pxx,
-                    'peak_freq': peak_freq,
-                    'peak_power': peak_power
+                    'power': pxx[k],
+                    'peak_freq': f[peak_idx[k]],
+                    'peak_power': pxx[k, peak_idx[k]]
                 }
         
-        return results 
\ No newline at end of file
+        return results 
+    
+    def analyze_segments(self, df, segments, max_workers=None):
+        """
+        Analyze several flight segments concurrently
+        
+        The segments are independent and their analysis spends its time in
+        NumPy and scipy.fft, which release the GIL, so they are run on a
+        thread pool that shares the log without copying it.
+        
+        Args:
+            df: DataFrame containing log data
+            segments: List of (start_index, end_index) tuples
+            max_workers: Maximum number of worker threads (None for the executor default)
+            
+        Returns:
+            List with the analyze_segment results for each segment, in order
+        """
+        # Bind the log up front so the workers only read the extracted columns,
+        # and release them afterwards rather than keeping a copy of the log
+        self.bind(df)
+        
+        try:
+            with ThreadPoolExecutor(max_workers=max_workers) as executor:
+                return list(executor.map(lambda segment: self.analyze_segment(df, segment), segments))
+        finally:
+            self.release()
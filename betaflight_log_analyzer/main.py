@@ -4,7 +4,18 @@ Main entry point for the Betaflight Log Analyzer
 import os
 import sys
 import argparse
-
+import cProfile
+import functools
+import glob
+import hashlib
+import pickle
+import pstats
+import shutil
+import tempfile
+from concurrent.futures import ProcessPoolExecutor
+import matplotlib
+import scipy.fft
+from betaflight_log_analyzer import __version__
 from betaflight_log_analyzer.utils.log_reader import BlackboxLogReader
 from betaflight_log_analyzer.analysis.segment_analyzer import FlightSegmentAnalyzer
 from betaflight_log_analyzer.analysis.pid_recommender import PIDRecommender
@@ -12,6 +23,461 @@ from betaflight_log_analyzer.analysis.advanced_analysis import AdvancedAnalyzer
 from betaflight_log_analyzer.visualization.plots import PlotGenerator
 from betaflight_log_analyzer.visualization.advanced_plots import AdvancedPlotGenerator
 from betaflight_log_analyzer.reports.html_reporter import HTMLReporter
+from betaflight_log_analyzer.utils.spectral import set_fft_workers
+
+try:
+    import pyfftw  # Optional, FFTW backend for the spectral analysis
+except ImportError:
+    pyfftw = None
+
+# Per-process analyzers and plot generators, set up by _init_worker
+_worker_state = {}
+
+# Per-sample series in the segment analysis, only needed for plotting and the
+# advanced analysis of each axis
+_SEGMENT_SERIES = ('time', 'rc', 'setpoint', 'gyro', 'error')
+
+# Advanced result entries read by the recommendations and the report, the only
+# ones saved in the analysis cache; analysis types not listed are kept whole
+_CACHED_ADVANCED_KEYS = {
+    'transfer_function': ('frequencies', 'coherence', 'phase_margin', 'resonant_frequencies'),
+    'arx_model': ('fit', 'step_response')
+}
+
+def _segment_metrics(segment_data):
+    """
+    Strip the per-sample series from a segment analysis, keeping its metrics
+    
+    Args:
+        segment_data: Dictionary returned by FlightSegmentAnalyzer.analyze_segment
+        
+    Returns:
+        Dictionary with the same axes, statistics, error metrics and spectral
+        peak, but without the sample and spectrum arrays
+    """
+    metrics = {}
+    for axis, axis_data in segment_data.items():
+        metrics[axis] = {key: value for key, value in axis_data.items() if key not in _SEGMENT_SERIES}
+        if 'frequency_analysis' in axis_data:
+            frequency_analysis = axis_data['frequency_analysis']
+            metrics[axis]['frequency_analysis'] = {
+                'peak_freq': frequency_analysis['peak_freq'],
+                'peak_power': frequency_analysis['peak_power']
+            }
+    return metrics
+
+def _use_fftw_backend():
+    """Route scipy.fft (used by all spectral analyses) through FFTW with plan caching, if pyFFTW is installed"""
+    if pyfftw is None:
+        return
+    pyfftw.interfaces.cache.enable()
+    pyfftw.interfaces.cache.set_keepalive_time(60)
+    scipy.fft.set_global_backend(pyfftw.interfaces.scipy_fft)
+
+def _init_worker(output_dir, advanced, skip_wavelet, plots=True, arx_grid=False, profile_dir=None,
+                 log_name=None):
+    """
+    Set up a worker process for _analyze_axis
+    
+    Args:
+        output_dir: Directory to save plots to
+        advanced: Whether to run the advanced analysis
+        skip_wavelet: Whether to skip the wavelet analysis
+        plots: Whether to generate plots
+        arx_grid: Whether to search a grid of ARX orders instead of fitting the default one
+        profile_dir: Directory to save per-task profiles to, when profiling
+        log_name: Log file name (without extension) to prefix the plot file names with
+    """
+    # Render off-screen; workers must never start a GUI backend
+    matplotlib.use('Agg')
+    _use_fftw_backend()
+    # The pool already runs one worker per CPU, so each worker's FFTs stay
+    # single threaded instead of oversubscribing the CPUs
+    set_fft_workers(1)
+    
+    _worker_state['plot_generator'] = PlotGenerator(output_dir, log_name)
+    _worker_state['advanced'] = advanced
+    _worker_state['skip_wavelet'] = skip_wavelet
+    _worker_state['plots'] = plots
+    _worker_state['arx_grid'] = arx_grid
+    _worker_state['profile_dir'] = profile_dir
+    if advanced:
+        _worker_state['advanced_analyzer'] = AdvancedAnalyzer()
+        _worker_state['advanced_plot_generator'] = AdvancedPlotGenerator(output_dir, log_name)
+
+def _analyze_axis(task):
+    """
+    Plot (and optionally run the advanced analysis of) one axis of one segment
+    
+    Args:
+        task: Tuple of (segment index, axis name, analyze_segment results for the axis)
+        
+    Returns:
+        Tuple of (plot key, segment plots, advanced results, advanced plots), where
+        the advanced entries are None unless advanced analysis is enabled and the
+        plot dictionaries are empty if plots are disabled
+    """
+    i, axis, axis_data = task
+    state = _worker_state
+    plot_generator = state['plot_generator']
+    advanced_analyzer = state.get('advanced_analyzer')
+    advanced_plot_generator = state.get('advanced_plot_generator')
+    plot_key = f"{i}_{axis}"
+    
+    segment_plots = {}
+    plots = state['plots']
+    if plots:
+        # Generate time domain plot
+        segment_plots['time_domain'], _ = plot_generator.plot_time_domain(
+            axis_data['time'],
+            axis_data['setpoint'],
+            axis_data['gyro'],
+            axis_data['error'],
+            axis,
+            i+1,
+            axis_data['error_metrics']['rms']
+        )
+        
+        # Generate PSD plot if frequency analysis available
+        if 'frequency_analysis' in axis_data:
+            segment_plots['psd'], _ = plot_generator.plot_psd(
+                axis_data['frequency_analysis']['frequencies'],
+                axis_data['frequency_analysis']['power'],
+                axis_data['frequency_analysis']['peak_freq'],
+                axis_data['frequency_analysis']['peak_power'],
+                axis,
+                i+1
+            )
+    
+    # Perform advanced analysis if requested
+    if not state['advanced']:
+        return plot_key, segment_plots, None, None
+    
+    advanced_plots = {}
+    advanced_results = {}
+    
+    # Extract relevant data for analysis
+    time_data = axis_data['time']
+    setpoint_data = axis_data['setpoint']
+    gyro_data = axis_data['gyro']
+    
+    # 1. Transfer function estimation
+    print(f"\nEstimating transfer function for {axis} axis, segment {i+1}...")
+    tf_data = advanced_analyzer.estimate_transfer_function(
+        time_data, setpoint_data, gyro_data
+    )
+    advanced_results['transfer_function'] = tf_data
+    
+    # Generate transfer function plot
+    if plots:
+        tf_img, _ = advanced_plot_generator.plot_transfer_function(
+            tf_data, axis, i+1
+        )
+        advanced_plots['transfer_function'] = tf_img
+    
+    # 2. ARX model identification
+    print(f"Identifying ARX model for {axis} axis, segment {i+1}...")
+    if state['arx_grid']:
+        # The pool already runs one worker per CPU, so the grid is fitted in
+        # this worker's thread rather than on a thread pool of its own
+        arx_data = advanced_analyzer.identify_arx_grid(
+            time_data, setpoint_data, gyro_data, max_workers=1
+        )
+        print(f"Best ARX order for {axis} axis, segment {i+1}: na, nb, nk = {arx_data['order']}")
+    else:
+        arx_data = advanced_analyzer.identify_arx_model(
+            time_data, setpoint_data, gyro_data
+        )
+    
+    # Generate ARX model plot
+    if plots:
+        arx_img, _ = advanced_plot_generator.plot_arx_model(
+            arx_data, time_data, setpoint_data, gyro_data, axis, i+1
+        )
+        advanced_plots['arx_model'] = arx_img
+    
+    # The predicted series is only plotted, so it is not sent back with the results
+    advanced_results['arx_model'] = {key: value for key, value in arx_data.items() if key != 'predicted'}
+    
+    # 3. Wavelet analysis (if not skipped). Its results are only plotted, so
+    # they are neither computed without plots nor sent back with the results
+    if plots and not state['skip_wavelet']:
+        print(f"Performing wavelet analysis for {axis} axis, segment {i+1}...")
+        wavelet_data = advanced_analyzer.wavelet_analysis(
+            time_data, gyro_data
+        )
+        if wavelet_data is not None:
+            # Generate wavelet plot
+            wavelet_img, _ = advanced_plot_generator.plot_wavelet_analysis(
+                wavelet_data, axis, i+1
+            )
+            advanced_plots['wavelet'] = wavelet_img
+    
+    # 4. Performance index
+    print(f"Calculating performance index for {axis} axis, segment {i+1}...")
+    gyro_psd = None
+    if 'frequency_analysis' in axis_data:
+        gyro_psd = (axis_data['frequency_analysis']['frequencies'], axis_data['frequency_analysis']['power'])
+    perf_data = advanced_analyzer.calculate_performance_index(
+        time_data, setpoint_data, gyro_data, gyro_psd=gyro_psd
+    )
+    advanced_results['performance'] = perf_data
+    
+    # Generate performance plot
+    if plots:
+        perf_img, _ = advanced_plot_generator.plot_performance_index(
+            perf_data, axis, i+1
+        )
+        advanced_plots['performance'] = perf_img
+    
+    return plot_key, segment_plots, advanced_results, advanced_plots
+
+def _profiled_analyze_axis(task):
+    """
+    Run _analyze_axis under cProfile, saving its stats in the worker profile directory
+    
+    Args:
+        task: Tuple of (segment index, axis name, analyze_segment results for the axis)
+        
+    Returns:
+        The _analyze_axis results
+    """
+    profiler = cProfile.Profile()
+    result = profiler.runcall(_analyze_axis, task)
+    profiler.dump_stats(os.path.join(_worker_state['profile_dir'], f"profile_{result[0]}.prof"))
+    return result
+
+@functools.lru_cache(maxsize=1)
+def _source_digest():
+    """
+    Hash the package's Python sources, so that any code change invalidates cached results
+    
+    Returns:
+        Hex digest of the source files' paths and contents
+    """
+    package_dir = os.path.dirname(os.path.abspath(__file__))
+    digest = hashlib.sha256()
+    for root, dirs, files in os.walk(package_dir):
+        dirs.sort()
+        for name in sorted(files):
+            if name.endswith('.py'):
+                path = os.path.join(root, name)
+                digest.update(os.path.relpath(path, package_dir).encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+    return digest.hexdigest()
+
+def _file_digest(path):
+    """
+    Hash a file's contents
+    
+    Args:
+        path: Path of the file
+        
+    Returns:
+        Hex digest of the file contents
+    """
+    digest = hashlib.sha256()
+    with open(path, 'rb') as f:
+        for chunk in iter(lambda: f.read(1 << 20), b''):
+            digest.update(chunk)
+    return digest.hexdigest()
+
+def _cache_path(args):
+    """
+    Get the path of the analysis cache for a run
+    
+    The cache is keyed by the log file contents, the options that affect the
+    analysis and the package sources, so any change to them misses the cache.
+    
+    Args:
+        args: Parsed command line arguments
+        
+    Returns:
+        Path of the cache file in the output directory
+    """
+    digest = hashlib.sha256(_file_digest(args.log_file).encode())
+    options = (args.blackbox_decode, args.throttle_threshold, args.advanced,
+               args.skip_wavelet, args.no_plots, args.arx_grid)
+    digest.update(repr((options, __version__, _source_digest())).encode())
+    return os.path.join(args.output_dir, f"analysis_cache_{digest.hexdigest()[:16]}.pkl")
+
+def _plot_files(results):
+    """
+    List the plot files linked by analysis results
+    
+    Args:
+        results: Tuple of (segment_results, segment_plots, advanced_results, advanced_plots)
+        
+    Returns:
+        List of plot file names, relative to the output directory
+    """
+    _, segment_plots, _, advanced_plots = results
+    return [plot_file
+            for plots in (segment_plots, advanced_plots)
+            for axis_plots in plots.values()
+            for plot_file in axis_plots.values()]
+
+def _load_cache(cache_path):
+    """
+    Load cached analysis results
+    
+    Args:
+        cache_path: Path of the cache file
+        
+    Returns:
+        Tuple of (segment_results, segment_plots, advanced_results, advanced_plots),
+        or None if there is no usable cache
+    """
+    if not os.path.exists(cache_path):
+        return None
+    try:
+        with open(cache_path, 'rb') as f:
+            results, plot_digests = pickle.load(f)
+    except Exception as e:
+        print(f"Warning: Could not load analysis cache {cache_path}: {e}")
+        return None
+    
+    # The report links the plots by file name, so they must all still exist
+    # next to the cache, unchanged since the results were saved
+    output_dir = os.path.dirname(cache_path)
+    for plot_file, plot_digest in plot_digests.items():
+        plot_path = os.path.join(output_dir, plot_file)
+        if not os.path.exists(plot_path) or _file_digest(plot_path) != plot_digest:
+            print(f"Analysis cache {cache_path} refers to a missing or changed plot {plot_file}, recomputing")
+            return None
+    return results
+
+def _save_cache(cache_path, results):
+    """
+    Save analysis results for later runs on the same log
+    
+    Only the advanced result entries used by the recommendations and the
+    report are saved, see _CACHED_ADVANCED_KEYS.
+    
+    Args:
+        cache_path: Path of the cache file
+        results: Tuple of (segment_results, segment_plots, advanced_results, advanced_plots)
+    """
+    segment_results, segment_plots, advanced_results, advanced_plots = results
+    advanced_results = {
+        plot_key: {
+            analysis_type: ({key: data[key] for key in _CACHED_ADVANCED_KEYS[analysis_type] if key in data}
+                            if analysis_type in _CACHED_ADVANCED_KEYS else data)
+            for analysis_type, data in axis_results.items()
+        }
+        for plot_key, axis_results in advanced_results.items()
+    }
+    results = segment_results, segment_plots, advanced_results, advanced_plots
+    
+    try:
+        output_dir = os.path.dirname(cache_path)
+        plot_digests = {plot_file: _file_digest(os.path.join(output_dir, plot_file))
+                        for plot_file in _plot_files(results)}
+        with open(cache_path, 'wb') as f:
+            pickle.dump((results, plot_digests), f, protocol=pickle.HIGHEST_PROTOCOL)
+    except Exception as e:
+        print(f"Warning: Could not save analysis cache {cache_path}: {e}")
+
+def _save_profile(profiler, profile_dir, output_dir):
+    """
+    Merge the main process profile with the worker profiles and print the hotspots
+    
+    Args:
+        profiler: cProfile.Profile of the main process
+        profile_dir: Private directory the worker profiles were saved to
+        output_dir: Directory to save the merged profile to
+    """
+    stats = pstats.Stats(profiler)
+    for worker_profile in glob.glob(os.path.join(profile_dir, "profile_*.prof")):
+        stats.add(worker_profile)
+    
+    profile_path = os.path.join(output_dir, "profile.prof")
+    stats.dump_stats(profile_path)
+    
+    print("\nSlowest functions (cumulative time over all processes):")
+    stats.sort_stats('cumulative').print_stats(25)
+    print(f"Profile saved to: {profile_path}")
+
+def _run_analysis(args, profile_dir=None):
+    """
+    Read the log, analyze its flight segments and generate the plots
+    
+    Args:
+        args: Parsed command line arguments
+        profile_dir: Directory for the worker processes to save their profiles
+            to, or None to not profile them
+        
+    Returns:
+        Tuple of (segment_results, segment_plots, advanced_results, advanced_plots),
+        or None if the log could not be read
+    """
+    # Read the log file
+    log_reader = BlackboxLogReader(args.blackbox_decode)
+    df = log_reader.read_log(args.log_file)
+    if df is None:
+        return None
+    
+    # Print some basic information
+    print("\nFirst few rows of the data:")
+    print(df.head())
+    
+    print("\nColumns in the data:")
+    print(df.columns.tolist())
+    
+    # Analyze flight segments
+    segment_analyzer = FlightSegmentAnalyzer(args.throttle_threshold)
+    segments = segment_analyzer.identify_segments(df)
+    
+    if args.advanced:
+        print("\nPerforming advanced analysis...")
+    
+    segment_results = {}
+    segment_plots = {}
+    advanced_results = {}
+    advanced_plots = {}
+    
+    # Analyze all segments concurrently
+    segment_analyses = segment_analyzer.analyze_segments(df, segments)
+    
+    # Only the metrics are kept for the recommendations and the report; the
+    # per-sample series are only needed by the workers
+    for i, segment_data in enumerate(segment_analyses):
+        segment_results[i] = _segment_metrics(segment_data)
+    
+    # Without plots or advanced analysis the workers would have nothing to do
+    if args.no_plots and not args.advanced:
+        return segment_results, segment_plots, advanced_results, advanced_plots
+    
+    # Plot and analyze each (segment, axis) pair in parallel worker processes.
+    # Segments are submitted in batches of one per worker, and each batch's
+    # series are released once it is done, so only a batch at a time is held
+    # (and pickled into the call queue) rather than the whole log
+    max_workers = os.cpu_count() or 1
+    log_name = os.path.splitext(os.path.basename(args.log_file))[0]
+    analyze_axis = _analyze_axis if profile_dir is None else _profiled_analyze_axis
+    with ProcessPoolExecutor(max_workers=max_workers, initializer=_init_worker,
+                             initargs=(args.output_dir, args.advanced, args.skip_wavelet,
+                                       not args.no_plots, args.arx_grid, profile_dir,
+                                       log_name)) as executor:
+        for start in range(0, len(segment_analyses), max_workers):
+            batch = range(start, min(start + max_workers, len(segment_analyses)))
+            tasks = [
+                (i, axis, segment_analyses[i][axis])
+                for i in batch
+                for axis in ['roll', 'pitch', 'yaw'] if axis in segment_analyses[i]
+            ]
+            for plot_key, plots, axis_results, axis_plots in executor.map(analyze_axis, tasks):
+                segment_plots[plot_key] = plots
+                if args.advanced:
+                    advanced_results[plot_key] = axis_results
+                    advanced_plots[plot_key] = axis_plots
+            
+            del tasks
+            for i in batch:
+                segment_analyses[i] = None
+    
+    return segment_results, segment_plots, advanced_results, advanced_plots
 
 def main():
     """
@@ -46,9 +512,32 @@ def main():
         action='store_true',
         help='Skip wavelet analysis (can be computationally intensive)'
     )
+    parser.add_argument(
+        '--arx-grid', 
+        action='store_true',
+        help='Fit ARX models over a grid of orders and delays and keep the best one (slower)'
+    )
+    parser.add_argument(
+        '--no-plots', 
+        action='store_true',
+        help='Skip generating plots (faster analysis)'
+    )
+    parser.add_argument(
+        '--no-cache', 
+        action='store_true',
+        help='Ignore and do not write the cached analysis results in the output directory'
+    )
+    parser.add_argument(
+        '--profile', 
+        action='store_true',
+        help='Profile the analysis (including worker processes) and save the stats to profile.prof'
+    )
     
     args = parser.parse_args()
     
+    # Use FFTW for the spectral analysis when available
+    _use_fftw_backend()
+    
     # Set default output directory if not specified
     if not args.output_dir:
         log_name = os.path.basename(args.log_file)
@@ -60,146 +549,31 @@ def main():
     
     print(f"Analyzing blackbox log: {args.log_file}")
     
-    # Read the log file
-    log_reader = BlackboxLogReader(args.blackbox_decode)
-    df = log_reader.read_log(args.log_file)
-    if df is None:
-        return
-    
-    # Print some basic information
-    print("\nFirst few rows of the data:")
-    print(df.head())
-    
-    print("\nColumns in the data:")
-    print(df.columns.tolist())
-    
-    # Analyze flight segments
-    segment_analyzer = FlightSegmentAnalyzer(args.throttle_threshold)
-    segments = segment_analyzer.identify_segments(df)
-    
-    # Initialize advanced analyzer if requested
-    advanced_analyzer = None
-    if args.advanced:
-        print("\nPerforming advanced analysis...")
-        advanced_analyzer = AdvancedAnalyzer()
-    
-    # Generate plots and analyze segments
-    plot_generator = PlotGenerator(args.output_dir)
-    advanced_plot_generator = None
-    if args.advanced:
-        advanced_plot_generator = AdvancedPlotGenerator(args.output_dir)
-    
-    segment_results = {}
-    segment_plots = {}
-    advanced_results = {}
-    advanced_plots = {}
-    
-    for i, segment in enumerate(segments):
-        # Analyze segment
-        segment_data = segment_analyzer.analyze_segment(df, segment)
-        segment_results[i] = segment_data
-        
-        # Generate plots for each axis
-        for axis in ['roll', 'pitch', 'yaw']:
-            if axis in segment_data:
-                axis_data = segment_data[axis]
-                
-                # Generate time domain plot
-                time_domain_img, _ = plot_generator.plot_time_domain(
-                    axis_data['time'],
-                    axis_data['setpoint'],
-                    axis_data['gyro'],
-                    axis_data['error'],
-                    axis,
-                    i+1,
-                    axis_data['error_metrics']['rms']
-                )
-                
-                # Generate PSD plot if frequency analysis available
-                psd_img = None
-                if 'frequency_analysis' in axis_data:
-                    psd_img, _ = plot_generator.plot_psd(
-                        axis_data['frequency_analysis']['frequencies'],
-                        axis_data['frequency_analysis']['power'],
-                        axis_data['frequency_analysis']['peak_freq'],
-                        axis_data['frequency_analysis']['peak_power'],
-                        axis,
-                        i+1
-                    )
-                    
-                    segment_plots[f"{i}_{axis}"] = {
-                        'time_domain': time_domain_img,
-                        'psd': psd_img
-                    }
-                else:
-                    segment_plots[f"{i}_{axis}"] = {
-                        'time_domain': time_domain_img
-                    }
-                
-                # Perform advanced analysis if requested
-                if args.advanced:
-                    plot_key = f"{i}_{axis}"
-                    advanced_plots[plot_key] = {}
-                    advanced_results[plot_key] = {}
-                    
-                    # Extract relevant data for analysis
-                    time_data = axis_data['time']
-                    setpoint_data = axis_data['setpoint']
-                    gyro_data = axis_data['gyro']
-                    
-                    # 1. Transfer function estimation
-                    print(f"\nEstimating transfer function for {axis} axis, segment {i+1}...")
-                    tf_data = advanced_analyzer.estimate_transfer_function(
-                        time_data, setpoint_data, gyro_data
-                    )
-                    advanced_results[plot_key]['transfer_function'] = tf_data
-                    
-                    # Generate transfer function plot
-                    tf_img, _ = advanced_plot_generator.plot_transfer_function(
-                        tf_data, axis, i+1
-                    )
-                    advanced_plots[plot_key]['transfer_function'] = tf_img
-                    
-                    # 2. ARX model identification
-                    print(f"Identifying ARX model for {axis} axis, segment {i+1}...")
-                    arx_data = advanced_analyzer.identify_arx_model(
-                        time_data, setpoint_data, gyro_data
-                    )
-                    advanced_results[plot_key]['arx_model'] = arx_data
-                    
-                    # Generate ARX model plot
-                    arx_img, _ = advanced_plot_generator.plot_arx_model(
-                        arx_data, time_data, setpoint_data, gyro_data, axis, i+1
-                    )
-                    advanced_plots[plot_key]['arx_model'] = arx_img
-                    
-                    # 3. Wavelet analysis (if not skipped)
-                    if not args.skip_wavelet:
-                        print(f"Performing wavelet analysis for {axis} axis, segment {i+1}...")
-                        wavelet_data = advanced_analyzer.wavelet_analysis(
-                            time_data, gyro_data
-                        )
-                        if wavelet_data is not None:
-                            advanced_results[plot_key]['wavelet'] = wavelet_data
-                            
-                            # Generate wavelet plot
-                            wavelet_img, _ = advanced_plot_generator.plot_wavelet_analysis(
-                                wavelet_data, axis, i+1
-                            )
-                            advanced_plots[plot_key]['wavelet'] = wavelet_img
-                    
-                    # 4. Performance index
-                    print(f"Calculating performance index for {axis} axis, segment {i+1}...")
-                    perf_data = advanced_analyzer.calculate_performance_index(
-                        time_data, setpoint_data, gyro_data
-                    )
-                    advanced_results[plot_key]['performance'] = perf_data
-                    
-                    # Generate performance plot
-                    perf_img, _ = advanced_plot_generator.plot_performance_index(
-                        perf_data, axis, i+1
-                    )
-                    advanced_plots[plot_key]['performance'] = perf_img
+    # Reuse the results of an earlier run on the same log and options
+    # (profiling always runs the analysis, a cached run would have nothing to profile)
+    use_cache = not (args.no_cache or args.profile) and os.path.isfile(args.log_file)
+    cache_path = _cache_path(args) if use_cache else None
+    results = _load_cache(cache_path) if cache_path else None
+    if results is not None:
+        print(f"Using cached analysis results from {cache_path}")
+    else:
+        if args.profile:
+            # Workers save their profiles to a private directory, so nothing
+            # else in the output directory is merged or removed
+            profile_dir = tempfile.mkdtemp(prefix='bf_profile_')
+            try:
+                profiler = cProfile.Profile()
+                results = profiler.runcall(_run_analysis, args, profile_dir)
+                _save_profile(profiler, profile_dir, args.output_dir)
+            finally:
+                shutil.rmtree(profile_dir, ignore_errors=True)
+        else:
+            results = _run_analysis(args)
+        if results is None:
+            return
+        if cache_path:
+            _save_cache(cache_path, results)
+    segment_results, segment_plots, advanced_results, advanced_plots = results
     
     # Generate PID recommendations
     pid_recommender = PIDRecommender()
@@ -147,6 +147,11 @@ class BlackboxLogReader:
             if 'time' in df.columns:
                 df['time'] = (df['time'] - df['time'].iloc[0]) / 1000000.0
             
+            # RC, setpoint and gyro values are logged as 16-bit integers, so single
+            # precision holds them exactly and halves the memory traffic of the analysis
+            signal_columns = [column for column in df.columns if column.startswith(('rc_', 'setpoint_', 'gyro_'))]
+            df[signal_columns] = df[signal_columns].astype(np.float32)
+            
             return df
         
         except Exception as e:
@@ -0,0 +1,127 @@
+"""
+Spectral estimation helpers shared by the analysis modules
+"""
+import functools
+import numpy as np
+from scipy import signal, fft
+
+# Threads used by each FFT call, -1 for all CPUs; lowered by set_fft_workers
+# in processes that already run one per CPU
+_fft_workers = -1
+
+def set_fft_workers(workers):
+    """
+    Set the number of threads used by the spectral FFTs in this process
+    
+    Args:
+        workers: Number of threads, -1 for all CPUs
+    """
+    global _fft_workers
+    _fft_workers = workers
+
+@functools.lru_cache(maxsize=8)
+def _hann_window(nperseg, dtype=np.float64):
+    """Return a (read-only) Hann window, cached since every call uses the same few lengths and dtypes"""
+    window = signal.get_window('hann', nperseg).astype(dtype)
+    window.flags.writeable = False
+    return window
+
+def _stft_segments(x, nperseg, step):
+    """
+    Split signals into detrended, Hann windowed Welch segments and transform them
+    
+    Args:
+        x: Array of signal values, one signal per row along the last axis
+        nperseg: Length of each segment
+        step: Number of samples between segment starts
+    
+    Returns:
+        Array of one-sided FFTs with shape (..., segments, frequencies)
+    """
+    segments = np.lib.stride_tricks.sliding_window_view(x, nperseg, axis=-1)[..., ::step, :]
+    segments = segments - segments.mean(axis=-1, keepdims=True)
+    return fft.rfft(segments * _hann_window(nperseg, x.dtype), axis=-1, workers=_fft_workers)
+
+@functools.lru_cache(maxsize=8)
+def _density_scale(fs, nperseg):
+    """
+    Return the one-sided density scaling for each frequency bin
+    
+    Cached (read-only) since every segment of a log shares the sampling
+    frequency and segment length.
+    
+    Args:
+        fs: Sampling frequency
+        nperseg: Length of each (Hann windowed) segment
+    
+    Returns:
+        Array of scale factors, doubling everything but DC (and Nyquist)
+    """
+    window = _hann_window(nperseg)
+    scale = np.full(nperseg // 2 + 1, 2.0 / (fs * np.sum(window**2)))
+    scale[0] /= 2
+    if nperseg % 2 == 0:
+        scale[-1] /= 2
+    scale.flags.writeable = False
+    return scale
+
+def power_spectrum(x, fs, nperseg=1024):
+    """
+    Estimate the power spectral density of one or more signals
+    
+    Equivalent to scipy.signal.welch (Hann window, 50% overlap, constant
+    detrending, density scaling), using the multi-threaded scipy.fft backend
+    for the segment transforms. Stacked signals are transformed in one batch.
+    
+    Args:
+        x: Array of signal values, one signal per row along the last axis
+        fs: Sampling frequency
+        nperseg: Length of each segment
+    
+    Returns:
+        Tuple of (frequencies, Pxx), with one spectrum per signal along the last axis of Pxx
+    """
+    x = np.asarray(x, dtype=np.result_type(x, np.float32))
+    nperseg = min(nperseg, x.shape[-1])
+    
+    X = _stft_segments(x, nperseg, nperseg - nperseg // 2)
+    Pxx = np.mean(X.real**2 + X.imag**2, axis=-2)
+    
+    freq = np.fft.rfftfreq(nperseg, 1/fs)
+    return freq, Pxx * _density_scale(fs, nperseg)
+
+def cross_spectra(x, y, fs, nperseg=1024):
+    """
+    Estimate the auto and cross power spectral densities of two signals
+    
+    Equivalent to calling scipy.signal.welch on both signals and
+    scipy.signal.csd on the pair (Hann window, 50% overlap, constant
+    detrending, density scaling), but each signal is only transformed once.
+    
+    Args:
+        x: Array of input signal values
+        y: Array of output signal values
+        fs: Sampling frequency
+        nperseg: Length of each segment
+    
+    Returns:
+        Tuple of (frequencies, Pxx, Pyy, Pxy)
+    """
+    # Keep single precision inputs in single precision, promote anything else
+    dtype = np.result_type(x, y, np.float32)
+    xy = np.stack([np.asarray(x, dtype=dtype), np.asarray(y, dtype=dtype)])
+    nperseg = min(nperseg, xy.shape[-1])
+    
+    step = nperseg - nperseg // 2
+    
+    # Transform both signals in one batched FFT
+    X, Y = _stft_segments(xy, nperseg, step)
+    
+    # Average the periodograms over all segments
+    Pxx = np.mean(X.real**2 + X.imag**2, axis=0)
+    Pyy = np.mean(Y.real**2 + Y.imag**2, axis=0)
+    Pxy = np.mean(X.conj() * Y, axis=0)
+    
+    scale = _density_scale(fs, nperseg)
+    freq = np.fft.rfftfreq(nperseg, 1/fs)
+    return freq, Pxx * scale, Pyy * scale, Pxy * scale
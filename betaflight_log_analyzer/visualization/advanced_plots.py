@@ -4,45 +4,44 @@ Module for visualizing advanced analysis results
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
 from matplotlib.colors import LogNorm
+from betaflight_log_analyzer.visualization.plots import save_figure
+
+# Time columns drawn in the wavelet scalogram; the figure is ~1800 pixels
+# wide, so more columns than this are not visible but still rasterized
+_MAX_SCALOGRAM_COLUMNS = 2000
 
 class AdvancedPlotGenerator:
     """Class for generating plots for advanced analysis results"""
     
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, log_name=None):
         """
         Initialize the advanced plot generator
         
         Args:
             output_dir: Directory to save plots to
+            log_name: Log file name (without extension) to prefix the plot file
+                names with, so that plots of several logs can share output_dir
         """
         self.output_dir = output_dir
+        self.file_prefix = f"{log_name}_" if log_name else ''
         os.makedirs(output_dir, exist_ok=True)
     
-    def _fig_to_base64(self, fig):
+    def _save_figure(self, fig, plot_path):
         """
-        Convert matplotlib figure to base64 string for HTML embedding
+        Save a matplotlib figure as a PNG file and close it
         
         Args:
             fig: Matplotlib figure object
-            
-        Returns:
-            Base64 encoded string of the figure
+            plot_path: Path to save the PNG to
         """
-        img_buf = BytesIO()
         # Set legend location explicitly instead of using "best" (default)
         for ax in fig.get_axes():
             legend = ax.get_legend()
             if legend is not None:
                 legend.set_loc('upper right')
                 
-        fig.savefig(img_buf, format='png', dpi=150, bbox_inches='tight')
-        img_buf.seek(0)
-        img_str = base64.b64encode(img_buf.read()).decode('utf-8')
-        plt.close(fig)
-        return img_str
+        save_figure(fig, plot_path)
     
     def plot_transfer_function(self, tf_data, axis, segment_id):
         """
@@ -54,7 +53,7 @@ class AdvancedPlotGenerator:
             segment_id: Segment identifier
             
         Returns:
-            Tuple of (base64 string of the plot, path to saved plot file)
+            Tuple of (plot file name relative to the output directory, path to saved plot file)
         """
         fig, (ax1, ax2, ax3) = plt.subplots(3, 1, figsize=(12, 12), dpi=150)
         
@@ -117,12 +116,11 @@ class AdvancedPlotGenerator:
         
         plt.tight_layout()
         
-        # Save the plot and encode for HTML
-        plot_path = os.path.join(self.output_dir, f'{axis}_tf_bode_{segment_id}.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-        img_base64 = self._fig_to_base64(fig)
+        # Save the plot, the report links to it by file name
+        plot_path = os.path.join(self.output_dir, f'{self.file_prefix}{axis}_tf_bode_{segment_id}.png')
+        self._save_figure(fig, plot_path)
         
-        return img_base64, plot_path
+        return os.path.basename(plot_path), plot_path
     
     def plot_arx_model(self, arx_data, time_data, setpoint_data, gyro_data, axis, segment_id):
         """
@@ -137,7 +135,7 @@ class AdvancedPlotGenerator:
             segment_id: Segment identifier
             
         Returns:
-            Tuple of (base64 string of the plot, path to saved plot file)
+            Tuple of (plot file name relative to the output directory, path to saved plot file)
         """
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), dpi=150)
         
@@ -221,12 +219,11 @@ class AdvancedPlotGenerator:
         
         plt.tight_layout()
         
-        # Save the plot and encode for HTML
-        plot_path = os.path.join(self.output_dir, f'{axis}_arx_model_{segment_id}.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-        img_base64 = self._fig_to_base64(fig)
+        # Save the plot, the report links to it by file name
+        plot_path = os.path.join(self.output_dir, f'{self.file_prefix}{axis}_arx_model_{segment_id}.png')
+        self._save_figure(fig, plot_path)
         
-        return img_base64, plot_path
+        return os.path.basename(plot_path), plot_path
     
     def plot_wavelet_analysis(self, wavelet_data, axis, segment_id):
         """
@@ -238,18 +235,28 @@ class AdvancedPlotGenerator:
             segment_id: Segment identifier
             
         Returns:
-            Tuple of (base64 string of the plot, path to saved plot file)
+            Tuple of (plot file name relative to the output directory, path to saved plot file)
         """
         if wavelet_data is None:
             return None, None
             
         fig, (ax1, ax2) = plt.subplots(2, 1, figsize=(12, 10), dpi=150)
         
-        # Extract data
-        time = wavelet_data['time']
+        # Extract data, decimating long segments in time for plotting. Each
+        # block of step columns is reduced with a max rather than sampled, so
+        # bursts shorter than a block still show up
+        n = len(wavelet_data['time'])
+        step = -(-n // _MAX_SCALOGRAM_COLUMNS)
+        starts = np.arange(0, n, step)
+        time = wavelet_data['time'][starts]
         freq = wavelet_data['frequencies']
-        power = wavelet_data['power']
-        dom_freqs = wavelet_data['dominant_frequencies']
+        power = np.maximum.reduceat(wavelet_data['power'], starts, axis=1)
+        
+        # Dominant frequency of the strongest column in each block
+        column_peaks = np.full(len(starts) * step, -np.inf)
+        column_peaks[:n] = wavelet_data['power'].max(axis=0)
+        strongest = starts + np.argmax(column_peaks.reshape(-1, step), axis=1)
+        dom_freqs = wavelet_data['dominant_frequencies'][strongest]
         
         # Plot scalogram
         # Convert power to dB for better visualization
@@ -300,22 +307,19 @@ class AdvancedPlotGenerator:
         mid_regions = wavelet_data['mid_regions']
         high_regions = wavelet_data['high_regions']
         
-        # Plot lines at the bottom of the plot for each region type
-        for t in low_regions:
-            ax2.plot([t, t], [0, 5], 'g-', alpha=0.5, linewidth=3)
-        for t in mid_regions:
-            ax2.plot([t, t], [0, 5], 'y-', alpha=0.5, linewidth=3)
-        for t in high_regions:
-            ax2.plot([t, t], [0, 5], 'r-', alpha=0.5, linewidth=3)
+        # Plot lines at the bottom of the plot for each region type, one
+        # collection per type rather than one line artist per sample
+        ax2.vlines(low_regions, 0, 5, colors='g', alpha=0.5, linewidth=3)
+        ax2.vlines(mid_regions, 0, 5, colors='y', alpha=0.5, linewidth=3)
+        ax2.vlines(high_regions, 0, 5, colors='r', alpha=0.5, linewidth=3)
         
         plt.tight_layout()
         
-        # Save the plot and encode for HTML
-        plot_path = os.path.join(self.output_dir, f'{axis}_wavelet_{segment_id}.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-        img_base64 = self._fig_to_base64(fig)
+        # Save the plot, the report links to it by file name
+        plot_path = os.path.join(self.output_dir, f'{self.file_prefix}{axis}_wavelet_{segment_id}.png')
+        self._save_figure(fig, plot_path)
         
-        return img_base64, plot_path
+        return os.path.basename(plot_path), plot_path
     
     def plot_performance_index(self, perf_data, axis, segment_id):
         """
@@ -327,7 +331,7 @@ class AdvancedPlotGenerator:
             segment_id: Segment identifier
             
         Returns:
-            Tuple of (base64 string of the plot, path to saved plot file)
+            Tuple of (plot file name relative to the output directory, path to saved plot file)
         """
         fig, ax = plt.subplots(figsize=(12, 8), dpi=150)
         
@@ -394,9 +398,8 @@ class AdvancedPlotGenerator:
         
         plt.tight_layout()
         
-        # Save the plot and encode for HTML
-        plot_path = os.path.join(self.output_dir, f'{axis}_performance_{segment_id}.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
-        img_base64 = self._fig_to_base64(fig)
+        # Save the plot, the report links to it by file name
+        plot_path = os.path.join(self.output_dir, f'{self.file_prefix}{axis}_performance_{segment_id}.png')
+        self._save_figure(fig, plot_path)
         
-        return img_base64, plot_path 
\ No newline at end of file
+        return os.path.basename(plot_path), plot_path 
\ No newline at end of file
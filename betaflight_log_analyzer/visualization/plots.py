@@ -4,37 +4,36 @@ Module for visualization functions
 import os
 import numpy as np
 import matplotlib.pyplot as plt
-from io import BytesIO
-import base64
 
-def fig_to_base64(fig):
+# Fast zlib level for the PNG writer; the default level spends most of the
+# save time compressing for a ~30% smaller file
+PNG_SAVE_KWARGS = {'compress_level': 1, 'optimize': False}
+
+def save_figure(fig, plot_path):
     """
-    Convert matplotlib figure to base64 string for HTML embedding
+    Save a matplotlib figure as a PNG file and close it
     
     Args:
         fig: Matplotlib figure object
-        
-    Returns:
-        Base64 encoded string of the figure
+        plot_path: Path to save the PNG to
     """
-    img_buf = BytesIO()
-    fig.savefig(img_buf, format='png', dpi=150, bbox_inches='tight')
-    img_buf.seek(0)
-    img_str = base64.b64encode(img_buf.read()).decode('utf-8')
+    fig.savefig(plot_path, format='png', dpi=150, bbox_inches='tight', pil_kwargs=PNG_SAVE_KWARGS)
     plt.close(fig)
-    return img_str
 
 class PlotGenerator:
     """Class for generating plots from flight data"""
     
-    def __init__(self, output_dir):
+    def __init__(self, output_dir, log_name=None):
         """
         Initialize the plot generator
         
         Args:
             output_dir: Directory to save plots to
+            log_name: Log file name (without extension) to prefix the plot file
+                names with, so that plots of several logs can share output_dir
         """
         self.output_dir = output_dir
+        self.file_prefix = f"{log_name}_" if log_name else ''
         os.makedirs(output_dir, exist_ok=True)
     
     def plot_time_domain(self, time_data, setpoint_data, gyro_data, error_data, 
@@ -52,7 +51,7 @@ class PlotGenerator:
             error_rms: RMS error value
             
         Returns:
-            Tuple of (base64 string of the plot, path to saved plot file)
+            Tuple of (plot file name relative to the output directory, path to saved plot file)
         """
         # Determine how much data to plot
         plot_length = min(5000, len(time_data))
@@ -105,15 +104,11 @@ class PlotGenerator:
                         arrowprops=dict(facecolor='black', shrink=0.05, width=1.5),
                         fontsize=10)
         
-        # Save figure and embed in HTML
-        plot_path = os.path.join(self.output_dir, f'{axis}_segment_{segment_id}.png')
-        plt.savefig(plot_path, dpi=150, bbox_inches='tight')
+        # Save figure, the report links to it by file name
+        plot_path = os.path.join(self.output_dir, f'{self.file_prefix}{axis}_segment_{segment_id}.png')
+        save_figure(fig, plot_path)
         
-        # Create base64 version for HTML embedding
-        img_base64 = fig_to_base64(fig)
-        plt.close(fig)
-        
-        return img_base64, plot_path
+        return os.path.basename(plot_path), plot_path
     
     def plot_psd(self, frequencies, power, peak_freq, peak_power, axis, segment_id):
         """
@@ -128,7 +123,7 @@ class PlotGenerator:
             segment_id: Segment identifier
             
         Returns:
-            Tuple of (base64 string of the plot, path to saved plot file)
+            Tuple of (plot file name relative to the output directory, path to saved plot file)
         """
         fig = plt.figure(figsize=(12, 8), dpi=150)
         
@@ -176,12 +171,8 @@ class PlotGenerator:
         plt.legend(loc='upper right', fontsize=10)
         plt.grid(True, linestyle='--', alpha=0.7)
         
-        # Save figure and embed in HTML
-        psd_path = os.path.join(self.output_dir, f'{axis}_psd_segment_{segment_id}.png')
-        plt.savefig(psd_path, dpi=150, bbox_inches='tight')
-        
-        # Create base64 version for HTML embedding
-        img_base64 = fig_to_base64(fig)
-        plt.close(fig)
+        # Save figure, the report links to it by file name
+        psd_path = os.path.join(self.output_dir, f'{self.file_prefix}{axis}_psd_segment_{segment_id}.png')
+        save_figure(fig, psd_path)
         
-        return img_base64, psd_path 
\ No newline at end of file
+        return os.path.basename(psd_path), psd_path 
\ No newline at end of file
@@ -0,0 +1,125 @@
+"""
+Unit tests for the advanced analysis module
+"""
+import unittest
+from unittest.mock import patch
+import numpy as np
+from scipy import signal
+
+from betaflight_log_analyzer.analysis.advanced_analysis import AdvancedAnalyzer, pywt
+
+class TestAdvancedAnalyzer(unittest.TestCase):
+    """Test class for AdvancedAnalyzer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.analyzer = AdvancedAnalyzer()
+        
+        # Create a simple second order system driven by a random setpoint
+        rng = np.random.default_rng(0)
+        self.fs = 1000.0
+        n = 5000
+        self.time_data = np.arange(n) / self.fs
+        self.setpoint_data = np.convolve(rng.normal(0, 50, n), np.ones(20) / 20, mode='same')
+        noise = rng.normal(0, 0.5, n)
+        self.gyro_data = np.zeros(n)
+        for i in range(2, n):
+            self.gyro_data[i] = (1.5 * self.gyro_data[i-1] - 0.6 * self.gyro_data[i-2]
+                                 + 0.1 * self.setpoint_data[i-1] + noise[i])
+    
+    def test_transfer_function_matches_scipy_welch(self):
+        """Test that the shared-spectrum estimate matches scipy's welch/csd/coherence"""
+        result = self.analyzer.estimate_transfer_function(
+            self.time_data, self.setpoint_data, self.gyro_data
+        )
+        
+        freq, Pxx = signal.welch(self.setpoint_data, self.fs, nperseg=1024)
+        _, Pxy = signal.csd(self.setpoint_data, self.gyro_data, self.fs, nperseg=1024)
+        _, coherence = signal.coherence(self.setpoint_data, self.gyro_data, self.fs, nperseg=1024)
+        
+        np.testing.assert_allclose(result['frequencies'], freq)
+        # The analysis runs in single precision
+        np.testing.assert_allclose(result['magnitude'], np.abs(Pxy / (Pxx + 1e-10)), rtol=1e-3)
+        np.testing.assert_allclose(result['coherence'], coherence, rtol=1e-3)
+    
+    def test_arx_model_recovers_known_system(self):
+        """Test that the ARX fit recovers the parameters of a known system"""
+        result = self.analyzer.identify_arx_model(
+            self.time_data, self.setpoint_data, self.gyro_data, na=2, nb=1, nk=1
+        )
+        
+        np.testing.assert_allclose(result['A'], [1.0, -1.5, 0.6], atol=0.05)
+        np.testing.assert_allclose(result['B'], [0.1], atol=0.02)
+        self.assertGreater(result['fit'], 80)
+        self.assertEqual(len(result['predicted']), len(self.gyro_data))
+        self.assertEqual(len(result['step_response']), 200)
+    
+    def test_arx_model_delay_longer_than_ar_order(self):
+        """Test that the ARX fit handles input delays longer than the AR order"""
+        result = self.analyzer.identify_arx_model(
+            self.time_data, self.setpoint_data, self.gyro_data, na=1, nb=3, nk=4
+        )
+        
+        self.assertEqual(len(result['parameters']), 4)
+        self.assertTrue(np.all(np.isfinite(result['predicted'])))
+    
+    def test_arx_grid_selects_best_fit(self):
+        """Test that the ARX grid search returns the best fitting order"""
+        result = self.analyzer.identify_arx_grid(
+            self.time_data, self.setpoint_data, self.gyro_data,
+            na_range=range(1, 3), nb_range=range(1, 3), nk_range=range(1, 3)
+        )
+        
+        self.assertEqual(len(result['grid']), 8)
+        self.assertEqual(result['fit'], max(result['grid'].values()))
+        self.assertEqual(result['grid'][result['order']], result['fit'])
+        self.assertEqual(result['order'][0], 2)
+    
+    def test_arx_grid_ignores_nan_fits(self):
+        """Test that an unstable order with a NaN fit never wins the grid search"""
+        fits = {(1, 1, 1): np.nan, (1, 2, 1): 40.0, (2, 1, 1): 60.0, (2, 2, 1): 50.0}
+        
+        with patch.object(self.analyzer, 'identify_arx_model',
+                          side_effect=lambda t, u, y, na, nb, nk: {'fit': fits[(na, nb, nk)]}):
+            result = self.analyzer.identify_arx_grid(
+                self.time_data, self.setpoint_data, self.gyro_data,
+                na_range=range(1, 3), nb_range=range(1, 3), nk_range=range(1, 2)
+            )
+        
+        self.assertEqual(result['order'], (2, 1, 1))
+        self.assertEqual(result['fit'], 60.0)
+    
+    @unittest.skipIf(pywt is None, "PyWavelets is not installed")
+    def test_wavelet_locates_high_frequency_burst(self):
+        """Test that the wavelet analysis places a short burst in the high band and finds the tone elsewhere"""
+        time_data = np.arange(3000) / self.fs
+        gyro_data = 20 * np.sin(2 * np.pi * 5 * time_data)
+        burst = (time_data >= 1.4) & (time_data < 1.6)
+        gyro_data[burst] += 100 * np.sin(2 * np.pi * 60 * time_data[burst])
+        
+        result = self.analyzer.wavelet_analysis(time_data, gyro_data)
+        
+        self.assertEqual(len(result['frequencies']), 60)
+        self.assertTrue(np.all((result['frequencies'] >= 2) & (result['frequencies'] <= 100)))
+        self.assertEqual(result['power'].shape, (60, len(time_data)))
+        
+        burst_times = time_data[burst]
+        self.assertGreater(len(result['high_regions']), 0)
+        self.assertTrue(np.all(np.isin(result['high_regions'], burst_times)))
+        self.assertFalse(np.any(np.isin(result['mid_regions'], burst_times)))
+        
+        # The real Morlet power dips at the tone's zero crossings, so compare
+        # the typical dominant frequency away from the burst
+        quiet = ((time_data > 0.5) & (time_data < 1.2)) | ((time_data > 1.8) & (time_data < 2.5))
+        self.assertAlmostEqual(np.median(result['dominant_frequencies'][quiet]), 5.0, delta=0.5)
+    
+    def test_arx_model_not_enough_data(self):
+        """Test that a dummy model is returned for very short logs"""
+        result = self.analyzer.identify_arx_model(
+            self.time_data[:5], self.setpoint_data[:5], self.gyro_data[:5]
+        )
+        
+        self.assertEqual(result['fit'], 0.0)
+
+if __name__ == '__main__':
+    unittest.main()
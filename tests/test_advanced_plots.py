@@ -0,0 +1,66 @@
+"""
+Unit tests for the advanced plots module
+"""
+import os
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+import matplotlib
+matplotlib.use('Agg')
+from matplotlib.axes import Axes
+
+from betaflight_log_analyzer.visualization.advanced_plots import AdvancedPlotGenerator
+
+class TestAdvancedPlotGenerator(unittest.TestCase):
+    """Test class for AdvancedPlotGenerator"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_dir = tempfile.mkdtemp()
+        self.plot_generator = AdvancedPlotGenerator(self.test_dir)
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_wavelet_decimation_keeps_short_spike(self):
+        """Test that decimating a long scalogram keeps the power and frequency of a one-column spike"""
+        n = 4501
+        frequencies = np.geomspace(2, 100, 60)
+        power = np.ones((60, n))
+        power[30, 2002] = 1e6
+        dominant_frequencies = np.full(n, frequencies[0])
+        dominant_frequencies[2002] = frequencies[30]
+        wavelet_data = {
+            'time': np.arange(n) / 1000.0,
+            'frequencies': frequencies,
+            'power': power,
+            'dominant_frequencies': dominant_frequencies,
+            'low_regions': np.array([]),
+            'mid_regions': np.array([]),
+            'high_regions': np.array([])
+        }
+        
+        with patch.object(Axes, 'pcolormesh', autospec=True, side_effect=Axes.pcolormesh) as mock_mesh, \
+             patch.object(Axes, 'plot', autospec=True, side_effect=Axes.plot) as mock_plot:
+            plot_file, plot_path = self.plot_generator.plot_wavelet_analysis(wavelet_data, 'roll', 1)
+        
+        self.assertEqual(plot_file, "roll_wavelet_1.png")
+        self.assertTrue(os.path.exists(plot_path))
+        
+        # The scalogram is decimated to at most 2000 columns, with the spike
+        # still at full power in its block (the colorbar draws the later meshes)
+        _, time_mesh, _, power_db = mock_mesh.call_args_list[0][0]
+        self.assertLessEqual(power_db.shape[1], 2000)
+        self.assertAlmostEqual(power_db.max(), 60.0, places=3)
+        self.assertEqual(np.unravel_index(np.argmax(power_db), power_db.shape)[0], 30)
+        
+        # The dominant frequency line shows the spike's frequency
+        dom_freqs = next(call[0][2] for call in mock_plot.call_args_list if call[0][3:] == ('b-',))
+        self.assertEqual(len(dom_freqs), time_mesh.shape[1])
+        self.assertIn(frequencies[30], dom_freqs)
+
+if __name__ == '__main__':
+    unittest.main()
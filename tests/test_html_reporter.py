@@ -5,7 +5,6 @@ import os
 import tempfile
 import unittest
 from unittest.mock import patch, MagicMock
-import base64
 import numpy as np
 
 from betaflight_log_analyzer.reports.html_reporter import HTMLReporter
@@ -138,29 +137,12 @@ class TestHTMLReporter(unittest.TestCase):
     
     def _create_mock_segment_plots(self):
         """Create mock segment plots for testing"""
-        # Create a tiny blank image encoded in base64 for testing
-        blank_image = np.zeros((10, 10, 3), dtype=np.uint8)
-        _, buffer = tempfile.mkstemp(suffix='.png')
-        import matplotlib.pyplot as plt
-        plt.imsave(buffer, blank_image)
-        with open(buffer, 'rb') as f:
-            image_data = f.read()
-        os.remove(buffer)
-        base64_image = base64.b64encode(image_data).decode('utf-8')
-        
         return {
-            '0_roll': {
-                'time_domain': base64_image,
-                'psd': base64_image
-            },
-            '0_pitch': {
-                'time_domain': base64_image,
-                'psd': base64_image
-            },
-            '0_yaw': {
-                'time_domain': base64_image,
-                'psd': base64_image
+            f'0_{axis}': {
+                'time_domain': f'{axis}_segment_1.png',
+                'psd': f'{axis}_psd_segment_1.png'
             }
+            for axis in ['roll', 'pitch', 'yaw']
         }
     
     def _create_mock_advanced_results(self):
@@ -230,35 +212,14 @@ class TestHTMLReporter(unittest.TestCase):
     
     def _create_mock_advanced_plots(self):
         """Create mock advanced plots for testing"""
-        # Create a tiny blank image encoded in base64 for testing
-        blank_image = np.zeros((10, 10, 3), dtype=np.uint8)
-        _, buffer = tempfile.mkstemp(suffix='.png')
-        import matplotlib.pyplot as plt
-        plt.imsave(buffer, blank_image)
-        with open(buffer, 'rb') as f:
-            image_data = f.read()
-        os.remove(buffer)
-        base64_image = base64.b64encode(image_data).decode('utf-8')
-        
         return {
-            '0_roll': {
-                'transfer_function': base64_image,
-                'arx_model': base64_image,
-                'wavelet': base64_image,
-                'performance': base64_image
-            },
-            '0_pitch': {
-                'transfer_function': base64_image,
-                'arx_model': base64_image,
-                'wavelet': base64_image,
-                'performance': base64_image
-            },
-            '0_yaw': {
-                'transfer_function': base64_image,
-                'arx_model': base64_image,
-                'wavelet': base64_image,
-                'performance': base64_image
+            f'0_{axis}': {
+                'transfer_function': f'{axis}_tf_bode_1.png',
+                'arx_model': f'{axis}_arx_model_1.png',
+                'wavelet': f'{axis}_wavelet_1.png',
+                'performance': f'{axis}_performance_1.png'
             }
+            for axis in ['roll', 'pitch', 'yaw']
         }
     
     def test_generate_report_creates_file(self):
@@ -349,6 +310,10 @@ class TestHTMLReporter(unittest.TestCase):
         self.assertIn("Step Response Analysis", content)
         self.assertIn("step response", content.lower())
         
+        # Plots are linked by file name rather than embedded
+        self.assertIn('<img src="roll_arx_model_1.png"', content)
+        self.assertNotIn("base64", content)
+        
     def test_report_without_advanced_data(self):
         """Test that the report still generates without advanced data"""
         # Call generate_report with basic data only
@@ -370,6 +335,40 @@ class TestHTMLReporter(unittest.TestCase):
         
         # Make sure it doesn't crash due to missing advanced data
         self.assertGreater(len(content), 0)
+    
+    def test_report_without_plots(self):
+        """Test that step response sections are omitted when no plots were generated"""
+        report_path = self.reporter.generate_report(
+            self.mock_analysis_results,
+            self.mock_recommendations,
+            self.mock_recommendations_text,
+            {},
+            self.mock_advanced_results,
+            {'0_roll': {}, '0_pitch': {'arx_model': ''}}
+        )
+        
+        with open(report_path, 'r') as f:
+            content = f.read()
+        
+        self.assertIn("ROLL Axis Analysis", content)
+        self.assertNotIn("<img", content)
+    
+    def test_report_escapes_log_name(self):
+        """Test that markup characters in the log file name are escaped"""
+        reporter = HTMLReporter(self.test_dir, "/path/to/<quad> & co.BFL")
+        
+        report_path = reporter.generate_report(
+            self.mock_analysis_results,
+            self.mock_recommendations,
+            self.mock_recommendations_text,
+            self.mock_segment_plots
+        )
+        
+        with open(report_path, 'r') as f:
+            content = f.read()
+        
+        self.assertIn("PID Analysis Report - &lt;quad&gt; &amp; co.BFL", content)
+        self.assertNotIn("<quad>", content)
 
 if __name__ == '__main__':
     unittest.main() 
\ No newline at end of file
@@ -0,0 +1,147 @@
+"""
+Unit tests for the analysis cache in the main module
+"""
+import os
+import argparse
+import shutil
+import tempfile
+import unittest
+from unittest.mock import patch
+import numpy as np
+
+from betaflight_log_analyzer.main import (
+    _cache_path, _load_cache, _save_cache, _init_worker, _analyze_axis, _worker_state
+)
+from betaflight_log_analyzer.utils.spectral import set_fft_workers
+
+class TestAnalysisCache(unittest.TestCase):
+    """Test class for the analysis result cache"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_dir = tempfile.mkdtemp()
+        self.log_file = os.path.join(self.test_dir, "LOG00001.csv")
+        with open(self.log_file, 'w') as f:
+            f.write("time,rcCommand[3]\n0,1500\n")
+        
+        self.args = argparse.Namespace(
+            log_file=self.log_file, output_dir=self.test_dir, blackbox_decode=None,
+            throttle_threshold=1300, advanced=True, skip_wavelet=False, no_plots=False,
+            arx_grid=False
+        )
+        
+        with open(os.path.join(self.test_dir, "roll_segment_1.png"), 'wb') as f:
+            f.write(b"png")
+        self.results = (
+            {0: {'roll': {'error_metrics': {'mean': 1.0, 'rms': 2.0, 'peak': 3.0}}}},
+            {'0_roll': {'time_domain': "roll_segment_1.png"}},
+            {'0_roll': {'arx_model': {'fit': 80.0}}},
+            {'0_roll': {}}
+        )
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        shutil.rmtree(self.test_dir)
+    
+    def test_cache_hit(self):
+        """Test that saved results are loaded back for the same log and options"""
+        _save_cache(_cache_path(self.args), self.results)
+        
+        self.assertEqual(_load_cache(_cache_path(self.args)), self.results)
+    
+    def test_cache_keeps_only_used_results(self):
+        """Test that advanced result entries unused by the report and recommendations are not cached"""
+        segment_results, segment_plots, _, advanced_plots = self.results
+        advanced_results = {'0_roll': {
+            'transfer_function': {'frequencies': [1.0], 'magnitude': [2.0], 'phase': [3.0],
+                                  'coherence': [0.9], 'phase_margin': 45.0, 'resonant_frequencies': []},
+            'arx_model': {'fit': 80.0, 'step_response': [0.5], 'parameters': [0.1], 'grid': {}},
+            'performance': {'performance_index': 70.0}
+        }}
+        _save_cache(_cache_path(self.args), (segment_results, segment_plots, advanced_results, advanced_plots))
+        
+        cached = _load_cache(_cache_path(self.args))[2]['0_roll']
+        self.assertEqual(set(cached['transfer_function']),
+                         {'frequencies', 'coherence', 'phase_margin', 'resonant_frequencies'})
+        self.assertEqual(cached['arx_model'], {'fit': 80.0, 'step_response': [0.5]})
+        self.assertEqual(cached['performance'], {'performance_index': 70.0})
+    
+    def test_cache_miss_on_option_change(self):
+        """Test that changing an analysis option or the log contents misses the cache"""
+        cache_path = _cache_path(self.args)
+        _save_cache(cache_path, self.results)
+        
+        for option, value in [('throttle_threshold', 1400), ('skip_wavelet', True),
+                              ('no_plots', True), ('arx_grid', True),
+                              ('blackbox_decode', '/opt/blackbox_decode')]:
+            args = argparse.Namespace(**{**vars(self.args), option: value})
+            self.assertNotEqual(_cache_path(args), cache_path, option)
+        
+        with open(self.log_file, 'a') as f:
+            f.write("1,1600\n")
+        self.assertNotEqual(_cache_path(self.args), cache_path)
+        self.assertIsNone(_load_cache(_cache_path(self.args)))
+    
+    def test_corrupt_cache_is_ignored(self):
+        """Test that an unreadable cache file falls back to a fresh analysis"""
+        cache_path = _cache_path(self.args)
+        with open(cache_path, 'wb') as f:
+            f.write(b"not a pickle")
+        
+        with patch('builtins.print') as mock_print:
+            self.assertIsNone(_load_cache(cache_path))
+        self.assertIn("Could not load analysis cache", mock_print.call_args[0][0])
+    
+    def test_cache_with_missing_plot_is_ignored(self):
+        """Test that a cache linking a deleted plot file is treated as a miss"""
+        cache_path = _cache_path(self.args)
+        _save_cache(cache_path, self.results)
+        os.remove(os.path.join(self.test_dir, "roll_segment_1.png"))
+        
+        with patch('builtins.print'):
+            self.assertIsNone(_load_cache(cache_path))
+    
+    def test_cache_with_changed_plot_is_ignored(self):
+        """Test that a cache linking a plot rewritten since it was saved is treated as a miss"""
+        cache_path = _cache_path(self.args)
+        _save_cache(cache_path, self.results)
+        with open(os.path.join(self.test_dir, "roll_segment_1.png"), 'wb') as f:
+            f.write(b"another png")
+        
+        with patch('builtins.print'):
+            self.assertIsNone(_load_cache(cache_path))
+
+class TestAxisPlots(unittest.TestCase):
+    """Test class for the plots generated by the worker processes"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.test_dir = tempfile.mkdtemp()
+        time = np.arange(500) / 1000.0
+        setpoint = 100 * np.sin(2 * np.pi * 5 * time)
+        gyro = setpoint + np.random.default_rng(0).normal(0, 5, len(time))
+        self.axis_data = {
+            'time': time, 'setpoint': setpoint, 'gyro': gyro, 'error': setpoint - gyro,
+            'error_metrics': {'mean': 4.0, 'rms': 5.0, 'peak': 15.0}
+        }
+    
+    def tearDown(self):
+        """Clean up test fixtures"""
+        _worker_state.clear()
+        set_fft_workers(-1)
+        shutil.rmtree(self.test_dir)
+    
+    def test_two_logs_share_output_dir(self):
+        """Test that the plots of two logs analyzed into one output directory do not overwrite each other"""
+        plot_files = []
+        for log_name in ("LOG00001", "LOG00002"):
+            _init_worker(self.test_dir, advanced=False, skip_wavelet=True, log_name=log_name)
+            _, segment_plots, _, _ = _analyze_axis((0, 'roll', self.axis_data))
+            plot_files.append(segment_plots['time_domain'])
+        
+        self.assertEqual(plot_files, ["LOG00001_roll_segment_1.png", "LOG00002_roll_segment_1.png"])
+        for plot_file in plot_files:
+            self.assertTrue(os.path.exists(os.path.join(self.test_dir, plot_file)))
+
+if __name__ == '__main__':
+    unittest.main()
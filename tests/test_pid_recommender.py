@@ -0,0 +1,104 @@
+"""
+Unit tests for the PID recommender module
+"""
+import unittest
+from unittest.mock import patch
+import numpy as np
+
+from betaflight_log_analyzer.analysis.pid_recommender import PIDRecommender
+
+class TestPIDRecommender(unittest.TestCase):
+    """Test class for PIDRecommender"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.recommender = PIDRecommender()
+        
+        # First order step response with a time constant of 20 samples
+        t = np.arange(200)
+        self.slow_step = 1 - np.exp(-t / 20)
+    
+    def test_arx_slow_step_response(self):
+        """Test rise and settling time detection on a slow first order response"""
+        rec, text = self.recommender._generate_arx_model_recommendations(
+            [{'fit': 90.0, 'step_response': self.slow_step}], 'roll'
+        )
+        
+        self.assertEqual((rec['P'], rec['I'], rec['D']), (30, 20, 0))
+        self.assertIn("rise time: 44.0 samples", text[0])
+        self.assertIn("settling time: 60.0 samples", text[2])
+    
+    def test_arx_step_response_that_never_settles(self):
+        """Test that no settling time is reported for an oscillating response"""
+        t = np.arange(200)
+        step_response = 1 - np.cos(0.3 * t)
+        
+        rec, text = self.recommender._generate_arx_model_recommendations(
+            [{'fit': 90.0, 'step_response': step_response}], 'roll'
+        )
+        
+        self.assertFalse(any("settling" in line for line in text))
+        self.assertEqual(rec['I'], 0)
+    
+    def test_arx_low_fit_is_ignored(self):
+        """Test that a poorly fitting ARX model yields no adjustments"""
+        rec, text = self.recommender._generate_arx_model_recommendations(
+            [{'fit': 10.0, 'step_response': self.slow_step}], 'roll'
+        )
+        
+        self.assertEqual((rec['P'], rec['I'], rec['D']), (0, 0, 0))
+        self.assertIn("fit quality is low", text[0])
+    
+    def test_basic_recommendations_skip_missing_axis_data(self):
+        """Test that basic metrics are averaged only over segments containing the axis"""
+        analysis_results = {
+            '0': {
+                'roll': {'error_metrics': {'mean': 40.0, 'rms': 60.0, 'peak': 50.0},
+                         'frequency_analysis': {'peak_freq': 40.0, 'peak_power': 3000.0}},
+                'yaw': {'error_metrics': {'mean': 1.0, 'rms': 2.0, 'peak': 5.0}}
+            },
+            '1': {
+                'roll': {'error_metrics': {'mean': 20.0, 'rms': 50.0, 'peak': 150.0}}
+            }
+        }
+        
+        with patch('builtins.print'):
+            recommendations, text = self.recommender.generate_recommendations(analysis_results)
+        
+        self.assertEqual(set(recommendations), {'roll', 'yaw'})
+        self.assertEqual(recommendations['roll']['error_metrics'], {'mean': 30.0, 'rms': 55.0, 'peak': 100.0})
+        self.assertEqual(recommendations['roll']['frequency'], {'peak_freq': 40.0, 'peak_power': 3000.0})
+        self.assertEqual((recommendations['roll']['P'], recommendations['roll']['I'],
+                          recommendations['roll']['D']), (15, 0, -20))
+        self.assertNotIn('frequency', recommendations['yaw'])
+        self.assertIn("Good tracking performance", text['yaw'])
+    
+    def test_conflicting_recommendations_are_explained(self):
+        """Test that opposing recommendations for the same term are reported"""
+        explanation = self.recommender._resolve_conflicts({'P'}, {'P', 'D'}, 0, 0, -10)
+        
+        self.assertIn("Conflicting P recommendations balanced out to no change.", explanation)
+        self.assertNotIn("Conflicting D", explanation)
+        self.assertIsNone(self.recommender._resolve_conflicts(set(), set(), 0, 0, 0))
+    
+    def test_conflicts_use_recommendation_directions(self):
+        """Test that conflicts are detected from the directions each source recommends"""
+        analysis_results = {
+            '0': {'roll': {'error_metrics': {'mean': 5.0, 'rms': 60.0, 'peak': 50.0}}}
+        }
+        advanced_results = {
+            '0_roll': {'transfer_function': {
+                'phase_margin': 20.0,
+                'frequencies': np.array([0.0, 10.0]),
+                'coherence': np.array([1.0, 1.0])
+            }}
+        }
+        
+        with patch('builtins.print'):
+            _, text = self.recommender.generate_recommendations(analysis_results, advanced_results)
+        
+        self.assertTrue(any("Conflicting P recommendations" in line for line in text['roll']))
+        self.assertFalse(any("Conflicting D recommendations" in line for line in text['roll']))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,92 @@
+"""
+Unit tests for the flight segment analyzer module
+"""
+import unittest
+from unittest.mock import patch
+import numpy as np
+import pandas as pd
+from scipy import signal
+
+from betaflight_log_analyzer.analysis.segment_analyzer import FlightSegmentAnalyzer
+
+class TestFlightSegmentAnalyzer(unittest.TestCase):
+    """Test class for FlightSegmentAnalyzer"""
+    
+    def setUp(self):
+        """Set up test fixtures"""
+        self.analyzer = FlightSegmentAnalyzer()
+        
+        # Create a 10 second log at 1 kHz
+        rng = np.random.default_rng(0)
+        n = 10000
+        t = np.arange(n) / 1000.0
+        data = {'time': t, 'rc_throttle': np.full(n, 1500.0)}
+        for axis in ['roll', 'pitch', 'yaw']:
+            setpoint = 100 * np.sin(2 * np.pi * 2 * t)
+            data[f'rc_{axis}'] = 1500 + setpoint
+            data[f'setpoint_{axis}'] = setpoint
+            data[f'gyro_{axis}'] = 0.9 * setpoint + rng.normal(0, 5, n)
+        self.df = pd.DataFrame(data)
+    
+    def test_power_spectrum_matches_scipy_welch(self):
+        """Test that the segment power spectrum matches scipy's welch"""
+        results = self.analyzer.analyze_segment(self.df, (0, len(self.df)))
+        
+        freq, pxx = signal.welch(self.df['gyro_roll'].values, 1000.0, nperseg=1024)
+        frequency_analysis = results['roll']['frequency_analysis']
+        
+        np.testing.assert_allclose(frequency_analysis['frequencies'], freq)
+        # The analysis runs in single precision
+        np.testing.assert_allclose(frequency_analysis['power'], pxx, rtol=1e-3)
+        self.assertEqual(frequency_analysis['peak_freq'], freq[np.argmax(pxx)])
+    
+    def test_analyze_segments_matches_sequential_analysis(self):
+        """Test that concurrent segment analysis returns the per-segment results in order"""
+        segments = [(0, 4000), (4000, 10000)]
+        results = self.analyzer.analyze_segments(self.df, segments, max_workers=2)
+        
+        self.assertEqual(len(results), 2)
+        for segment, result in zip(segments, results):
+            expected = self.analyzer.analyze_segment(self.df, segment)
+            self.assertEqual(result['pitch']['error_metrics'], expected['pitch']['error_metrics'])
+            np.testing.assert_array_equal(result['yaw']['gyro'], expected['yaw']['gyro'])
+    
+    def test_analyze_segments_releases_bound_log(self):
+        """Test that analyze_segments drops the extracted columns when it returns"""
+        self.analyzer.analyze_segments(self.df, [(0, 4000)], max_workers=1)
+        
+        self.assertIsNone(self.analyzer._time)
+        self.assertEqual(self.analyzer._cols, {})
+    
+    def test_bind_rebinds_changed_log(self):
+        """Test that binding a log whose time stamps changed in place extracts its columns again"""
+        self.analyzer.bind(self.df)
+        self.df['time'] += 1.0
+        self.analyzer.bind(self.df)
+        
+        self.assertEqual(self.analyzer._time[0], 1.0)
+    
+    def _throttle_log(self, throttle):
+        """Create a 1 kHz log with only time and throttle columns"""
+        return pd.DataFrame({'time': np.arange(len(throttle)) / 1000.0, 'rc_throttle': throttle})
+    
+    def test_identify_segments_when_log_starts_on_the_ground(self):
+        """Test that only active spans are returned when the log starts with low throttle"""
+        throttle = np.r_[np.full(6000, 1000), np.full(7000, 1500), np.full(6000, 1000)]
+        
+        with patch('builtins.print'):
+            segments = self.analyzer.identify_segments(self._throttle_log(throttle))
+        
+        self.assertEqual(segments, [(6000, 13000)])
+    
+    def test_identify_segments_open_at_log_bounds(self):
+        """Test segments that start at the first sample or end at the last sample"""
+        throttle = np.r_[np.full(6000, 1500), np.full(2000, 1000), np.full(7000, 1500)]
+        
+        with patch('builtins.print'):
+            segments = self.analyzer.identify_segments(self._throttle_log(throttle))
+        
+        self.assertEqual(segments, [(0, 6000), (8000, 15000)])
+
+if __name__ == '__main__':
+    unittest.main()